@@ -0,0 +1,60 @@
+"""
+Benchmark de análisis y normalización de estructuras pegadas.
+
+Genera un directorio cuyos hijos tienen un archivo cada uno, escrito con
+indentación (el caso que antes era cuadrático), y mide analizar_estructura y
+FileHandler._normalize_directory_structure para varios tamaños. Ambos deben
+crecer de forma lineal con la cantidad de líneas.
+
+    python scripts/bench_normalizar.py
+    python scripts/bench_normalizar.py --lineas 1000 10000 100000 --repeticiones 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.file_handler import FileHandler  # noqa: E402
+from src.utils.structure_parser import analizar_estructura  # noqa: E402
+
+
+def generar_estructura(lineas: int) -> str:
+    """Texto indentado de unas `lineas` líneas: raiz/ con subdirectorios de un archivo"""
+    partes = ["raiz/"]
+    for i in range((lineas - 1) // 2):
+        partes.append(f"    dir{i}/")
+        partes.append(f"        archivo{i}.txt")
+    return "\n".join(partes)
+
+
+def medir(funcion, argumento, repeticiones: int) -> float:
+    """Mejor tiempo de `repeticiones` ejecuciones, en segundos"""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(argumento)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--lineas', type=int, nargs='+', default=[1000, 2000, 4000, 8000, 100000],
+                        help="tamaños de la estructura generada")
+    parser.add_argument('--repeticiones', type=int, default=3, help="se informa el mejor tiempo")
+    args = parser.parse_args(argv)
+
+    print(f"{'líneas':>10}  {'analizar (s)':>12}  {'normalizar (s)':>14}  {'µs/línea':>9}")
+    for lineas in args.lineas:
+        texto = generar_estructura(lineas)
+        analizar = medir(analizar_estructura, texto, args.repeticiones)
+        normalizar = medir(FileHandler._normalize_directory_structure, texto, args.repeticiones)
+        print(f"{lineas:>10,}  {analizar:>12.3f}  {normalizar:>14.3f}  {normalizar / lineas * 1e6:>9.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
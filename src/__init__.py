@@ -7,6 +7,13 @@ Una aplicación para convertir y visualizar estructuras de directorios.
 __version__ = '1.0.0'
 __author__ = 'HabunoGD1809'
 
-from .app import ConvertidorDirectorios
-
 __all__ = ['ConvertidorDirectorios']
+
+
+def __getattr__(nombre):
+    # La interfaz gráfica (tkinter, ttkthemes, pyperclip) solo se importa al pedirla,
+    # para que la línea de comandos (python -m src) no la cargue
+    if nombre == 'ConvertidorDirectorios':
+        from .app import ConvertidorDirectorios
+        return ConvertidorDirectorios
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -0,0 +1,7 @@
+import sys
+
+from .cli import main
+
+# Con el método spawn los procesos del modo por lotes vuelven a importar este módulo
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,3 +1,6 @@
+import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import pyperclip
@@ -7,10 +10,24 @@ from .config.settings import Settings
 from .ui.styles import Styles
 from .ui.components import UIComponents
 from .ui.preferences_dialog import PreferencesDialog
+from .ui.plan_dialog import PlanDialog
 from .utils.logger import setup_logger
 from .utils.file_handler import FileHandler, Nodo
+from .utils.renderers import formato_por_extension, exportar
+from .utils.snapshot import EXTENSION as EXTENSION_INSTANTANEA, Instantanea, es_instantanea, guardar_instantanea
+from .utils.structure_parser import analizar_estructura
+from .utils.scan_worker import ScanWorker
+from .utils.search_index import IndiceBusqueda
+from .utils.exclusion import Exclusiones
+from .utils.scan_cache import ScanCache
+from .utils.watcher import DirectoryWatcher
 
 class ConvertidorDirectorios:
+    INTERVALO_COLA_MS = 50  # Frecuencia de lectura de resultados del escaneo
+    INTERVALO_VIGILANCIA_MS = 200  # Frecuencia de lectura de cambios del directorio vigilado
+    MAX_PARCHES_PREVIEW = 20  # Con más directorios cambiados se vuelve a renderizar todo
+    ESPERA_INDICE_MS = 200  # Reintento de una búsqueda mientras se arma el índice
+
     def __init__(self):
         # Inicializar la ventana principal
         self.window = tk.Tk()
@@ -27,7 +44,20 @@ class ConvertidorDirectorios:
         
         # Variables de control
         self.usar_iconos = tk.BooleanVar(value=self.settings.get('usar_iconos', True))
-        self.estructura_actual = ""
+        self.vigilar_cambios = tk.BooleanVar(value=self.settings.get('vigilar_cambios', False))
+        self._arbol_actual = None  # Árbol escaneado del último directorio cargado
+        self._ultimo_directorio = None  # Directorio del que proviene _arbol_actual
+        self._instantanea_actual = None  # Instantánea (.cdsnap) de la que proviene _arbol_actual, completa
+        self._escaneo = None  # ScanWorker en curso, si lo hay
+        self._vigilante = None  # DirectoryWatcher del directorio cargado, si lo hay
+        self._opciones_arbol = None  # (exclusiones, seguir_enlaces) con que se escaneó el árbol
+        self._indice = None  # IndiceBusqueda del árbol cargado
+        self._filtro = ''  # Búsqueda aplicada al preview ('' = árbol completo)
+        self._busqueda_pendiente = None  # after() que espera a que el índice esté listo
+        self._coincidencias = []  # Ids de las entradas que coinciden con el filtro
+        self._cache_escaneo = ScanCache(
+            os.path.join(os.path.dirname(self.settings.config_file), 'cache_escaneo.json')
+        )
         
         # Aplicar tema inicial
         self.aplicar_tema()
@@ -48,9 +78,15 @@ class ConvertidorDirectorios:
         callbacks = {
             'actualizar_preview': self.actualizar_preview,
             'convertir_directorio': self.convertir_directorio,
+            'explorar_directorio': self.explorar_directorio,
+            'exportar_explorador': self.exportar_explorador,
+            'buscar': self.buscar_en_estructura,
+            'cancelar_escaneo': self.cancelar_escaneo,
+            'alternar_vigilancia': self.alternar_vigilancia,
             'crear_desde_estructura': self.crear_desde_estructura,
             'copiar_estructura': self.copiar_estructura,
             'guardar_estructura': self.guardar_estructura,
+            'abrir_instantanea': self.abrir_instantanea,
             'abrir_preferencias': self.abrir_preferencias
         }
         
@@ -59,7 +95,7 @@ class ConvertidorDirectorios:
         
         # Crear secciones de la UI
         self.ui.create_title_section()
-        self.ui.create_options_section(self.usar_iconos)
+        self.ui.create_options_section(self.usar_iconos, self.vigilar_cambios)
         self.ui.create_buttons_section()
         _, self.preview_text = self.ui.create_preview_section()
         self.ui.create_action_buttons()
@@ -78,6 +114,7 @@ class ConvertidorDirectorios:
         if hasattr(self, 'preview_text'):
             text_config = self.styles.get_text_widget_config()
             self.preview_text.configure(**text_config)
+            self.ui.configure_editor_tags()
         
         # Reconfigurar estilos si ya están inicializados
         if hasattr(self, 'style'):
@@ -99,38 +136,412 @@ class ConvertidorDirectorios:
 
     def _get_preview_content(self):
         """Obtiene el contenido del área de preview, ignorando el placeholder"""
+        if self.ui.virtual_preview.active:
+            return self.ui.virtual_preview.content().strip()
         content = self.preview_text.get("1.0", tk.END).strip()
         if content == "Pega aquí tu estructura o carga un directorio...":
             return ""
         return content
 
     def convertir_directorio(self):
-        """Convierte un directorio a estructura"""
+        """Convierte un directorio a estructura escaneándolo en segundo plano"""
         try:
+            if self._escaneo is not None:
+                self.ui.show_message("⚠️ Ya hay un escaneo en curso", "warning")
+                return
+                
             dir_path = filedialog.askdirectory(title="Seleccionar Directorio")
             if not dir_path:
                 return
                 
-            self.logger.info(f"Procesando directorio: {dir_path}")
-            self._ultimo_directorio = dir_path  # Guardar referencia al último directorio
+            self.logger.info("Procesando directorio: %s", dir_path)
+            self._iniciar_escaneo(ScanWorker(
+                dir_path,
+                self.usar_iconos.get(),
+                exclude_patterns=self._crear_exclusiones(),
+                workers=self.settings.get('scan_workers', 8),
+                seguir_enlaces=self.settings.get('seguir_enlaces', False),
+                cache=self._cache_escaneo if self.settings.get('usar_cache_escaneo', True) else None
+            ))
             
-            if self.usar_iconos.get():
-                estructura = FileHandler.generar_estructura_iconos(dir_path)
-            else:
-                estructura = FileHandler.generar_estructura_arbol(dir_path)
+        except Exception as e:
+            self.logger.error("Error al convertir directorio: %s", e)
+            self.ui.show_message(f"❌ Error al procesar el directorio: {str(e)}", "error")
+
+    def abrir_instantanea(self):
+        """Carga un árbol guardado como instantánea (.cdsnap) sin volver a escanear"""
+        try:
+            if self._escaneo is not None:
+                self.ui.show_message("⚠️ Ya hay un escaneo en curso", "warning")
+                return
                 
-            if estructura in ["📂 Directorio vacío", "└── Directorio vacío"]:
-                self.ui.show_message("⚠️ El directorio seleccionado está vacío", "warning")
+            filename = filedialog.askopenfilename(
+                filetypes=[
+                    ("Instantánea de estructura", f"*{EXTENSION_INSTANTANEA}"),
+                    ("Todos los archivos", "*.*")
+                ],
+                title="Abrir Instantánea"
+            )
+            if not filename:
+                return
+            if not es_instantanea(filename):
+                self.ui.show_message("❌ El archivo no es una instantánea de estructura", "error")
+                return
+                
+            self.logger.info("Abriendo instantánea: %s", filename)
+            self._iniciar_escaneo(ScanWorker(None, self.usar_iconos.get(), instantanea=filename))
+            
+        except Exception as e:
+            self.logger.error("Error al abrir la instantánea: %s", e)
+            self.ui.show_message(f"❌ Error al abrir la instantánea: {str(e)}", "error")
+
+    def _iniciar_escaneo(self, escaneo):
+        """Vacía el preview y lanza el escaneo; los resultados parciales se muestran a medida que llegan"""
+        self._detener_vigilancia()
+        self._arbol_actual = None
+        self._instantanea_actual = None
+        self._opciones_arbol = None
+        self._indice = None
+        self._quitar_filtro()
+        self.ui.virtual_preview.deactivate()
+        self.ui.reset_editor_marks()
+        self.preview_text.delete("1.0", tk.END)
+        self.preview_text.configure(fg=self.styles.current_theme['preview_fg'])
+        
+        self._escaneo = escaneo
+        self._escaneo.iniciar()
+        self.ui.set_scanning(True)
+        self.ui.show_progress("⏳ Escaneando... 0 entradas")
+        self.window.after(self.INTERVALO_COLA_MS, self._procesar_cola_escaneo)
+
+    def _crear_exclusiones(self):
+        """Exclusiones configuradas en las preferencias"""
+        return Exclusiones(
+            self.settings.get('exclusiones'),
+            usar_gitignore=self.settings.get('usar_gitignore', True)
+        )
+
+    def explorar_directorio(self):
+        """Abre un directorio en el explorador, que lista cada carpeta al expandirla"""
+        try:
+            dir_path = filedialog.askdirectory(title="Seleccionar Directorio")
+            if not dir_path:
                 return
                 
-            self.estructura_actual = estructura
+            self.ui.show_explorer()
+            self.ui.explorer.cargar(
+                dir_path,
+                self._crear_exclusiones(),
+                self.settings.get('seguir_enlaces', False)
+            )
+            self.logger.info("Explorando directorio: %s", dir_path)
+            
+        except Exception as e:
+            self.logger.error("Error al explorar directorio: %s", e)
+            self.ui.show_message(f"❌ Error al explorar el directorio: {str(e)}", "error")
+
+    def exportar_explorador(self, dir_path, recorrido):
+        """Lleva al editor lo expandido (o lo marcado) en el explorador"""
+        if self._escaneo is not None:
+            self.ui.show_message("⚠️ Espera a que termine el escaneo en curso", "warning")
+            return
+            
+        try:
+            raiz = Nodo(os.path.basename(os.path.normpath(dir_path)), True)
+            for _ in Nodo.construir(raiz, recorrido):
+                pass
+                
+            # El árbol es un subconjunto del directorio: no se puede vigilar
+            self._detener_vigilancia()
+            self._arbol_actual = raiz
+            self._ultimo_directorio = dir_path
+            self._instantanea_actual = None
+            self._opciones_arbol = None
+            self._indice = self._indexar(raiz)
+            self._quitar_filtro()
             self.actualizar_preview()
+            
+            self.ui.show_message(
+                f"✅ {raiz.contar_descendientes():,} entradas exportadas desde el explorador",
+                "success"
+            )
+            
+        except Exception as e:
+            self.logger.error("Error exportando desde el explorador: %s", e)
+            self.ui.show_message(f"❌ Error al exportar: {str(e)}", "error")
+
+    def _indexar(self, arbol):
+        """Devuelve un índice del árbol que se arma en otro hilo (listo cuando termina)"""
+        indice = IndiceBusqueda()
+        
+        def armar():
+            try:
+                for _ in indice.indexar(arbol.recorrer()):
+                    pass
+                indice.finalizar()
+            except Exception as e:
+                self.logger.error("Error indexando la estructura: %s", e)
+                
+        threading.Thread(target=armar, daemon=True).start()
+        return indice
+
+    def buscar_en_estructura(self, consulta):
+        """Muestra en el preview solo las entradas cuyo nombre coincide y sus ancestros"""
+        if self._busqueda_pendiente is not None:
+            self.window.after_cancel(self._busqueda_pendiente)
+            self._busqueda_pendiente = None
+            
+        consulta = consulta.strip()
+        if self._arbol_actual is None or self._escaneo is not None:
+            if consulta:
+                self.ui.show_message("⚠️ Carga un directorio para buscar en su estructura", "warning")
+            return
+            
+        if not consulta:
+            if self._filtro:
+                self._filtro = ''
+                self.actualizar_preview()
+            return
+            
+        if self._indice is None:
+            self._indice = self._indexar(self._arbol_actual)
+        if not self._indice.listo:
+            self.ui.show_progress("⏳ Indexando la estructura...")
+            self._busqueda_pendiente = self.window.after(
+                self.ESPERA_INDICE_MS, lambda: self.buscar_en_estructura(consulta)
+            )
+            return
+            
+        try:
+            self._filtro = consulta
+            self.actualizar_preview()
+            self.ui.show_message(
+                f"🔍 {len(self._coincidencias):,} coincidencias para «{consulta}»",
+                "info" if self._coincidencias else "warning"
+            )
+        except Exception as e:
+            self.logger.error("Error buscando en la estructura: %s", e)
+            self.ui.show_message(f"❌ Error en la búsqueda: {str(e)}", "error")
+
+    def _quitar_filtro(self):
+        """Olvida la búsqueda actual y vacía el cuadro de búsqueda"""
+        if self._busqueda_pendiente is not None:
+            self.window.after_cancel(self._busqueda_pendiente)
+            self._busqueda_pendiente = None
+        self._filtro = ''
+        self.ui.clear_search()
+
+    def _recorrido_arbol_actual(self):
+        """Recorrido del árbol cargado, o solo de lo que coincide con la búsqueda"""
+        if self._filtro and self._indice is not None and self._indice.listo:
+            self._coincidencias = self._indice.coincidencias(self._filtro)
+            return self._indice.filtrar(self._coincidencias)
+        return self._arbol_actual.recorrer()
+
+    def _lineas_arbol_actual(self):
+        """Líneas del árbol cargado, o solo de lo que coincide con la búsqueda"""
+        return FileHandler.lineas_recorrido(self._recorrido_arbol_actual(), self.usar_iconos.get())
+
+    def cancelar_escaneo(self):
+        """Cancela el escaneo en curso conservando los resultados parciales"""
+        if self._escaneo is not None:
+            self._escaneo.cancelar()
+            self.ui.show_progress("⏳ Cancelando escaneo...")
+
+    def _procesar_cola_escaneo(self):
+        """Consume los mensajes del escaneo en segundo plano sin bloquear la interfaz"""
+        escaneo = self._escaneo
+        if escaneo is None:
+            return
+            
+        try:
+            while True:
+                mensaje = escaneo.cola.get_nowait()
+                tipo = mensaje[0]
+                
+                if tipo == 'progreso':
+                    _, total, lineas = mensaje
+                    self._insertar_lineas(lineas)
+                    self.ui.show_progress(f"⏳ Escaneando... {total:,} entradas")
+                else:
+                    self._finalizar_escaneo(escaneo, tipo, mensaje[1])
+                    return
+        except queue.Empty:
+            pass
+            
+        self.window.after(self.INTERVALO_COLA_MS, self._procesar_cola_escaneo)
+
+    def _finalizar_escaneo(self, escaneo, tipo, resultado):
+        """Aplica el resultado final (o parcial) de un escaneo"""
+        self._escaneo = None
+        self.ui.set_scanning(False)
+        
+        if tipo == 'error':
+            self.logger.error("Error al convertir directorio: %s", resultado)
+            self.ui.show_message(f"❌ Error al procesar el directorio: {str(resultado)}", "error")
+            return
+            
+        if not resultado.hijos:
+            self.actualizar_preview()
+            if tipo == 'fin':
+                self.ui.show_message("⚠️ El directorio seleccionado está vacío", "warning")
+            else:
+                self.ui.show_message("⏹️ Escaneo cancelado", "warning")
+            return
+            
+        self._arbol_actual = resultado
+        self._indice = escaneo.indice
+        if escaneo.instantanea is None:
+            self._ultimo_directorio = escaneo.dir_path
+            self._opciones_arbol = (escaneo.exclude_patterns, escaneo.seguir_enlaces)
+        else:
+            # Un árbol leído de una instantánea puede no coincidir con el disco: no se vigila
+            # ni se leen tamaños de su directorio de origen; se exporta desde la instantánea
+            self._ultimo_directorio = None
+            if tipo == 'fin':
+                self._instantanea_actual = escaneo.instantanea
+        
+        # Si el modo cambió durante el escaneo, volver a renderizar desde el árbol
+        if escaneo.usar_iconos != self.usar_iconos.get():
+            self.actualizar_preview()
+        self._marcar_preview_limpio()
+            
+        if tipo == 'fin':
             self.ui.show_message("✅ Estructura generada correctamente", "success")
             self.logger.info("Estructura generada exitosamente")
+            if self.vigilar_cambios.get() and self._opciones_arbol is not None:
+                self._iniciar_vigilancia()
+        else:
+            self.ui.show_message("⏹️ Escaneo cancelado: se muestran los resultados parciales", "warning")
+            self.logger.info("Escaneo cancelado por el usuario")
+
+    def alternar_vigilancia(self):
+        """Activa o desactiva la vigilancia del directorio cargado"""
+        if not self.vigilar_cambios.get():
+            self._detener_vigilancia()
+        elif self._opciones_arbol is not None and self._escaneo is None:
+            self._iniciar_vigilancia()
+
+    def _iniciar_vigilancia(self):
+        """Empieza a vigilar los directorios del árbol cargado"""
+        self._detener_vigilancia()
+        try:
+            self._vigilante = DirectoryWatcher.crear(
+                self._ultimo_directorio, self._arbol_actual.directorios(self._opciones_arbol[1])
+            )
+            self._vigilante.iniciar()
+            self.logger.info("Vigilando cambios en: %s", self._ultimo_directorio)
+            self.window.after(self.INTERVALO_VIGILANCIA_MS, self._procesar_cola_vigilancia)
+        except Exception as e:
+            self._vigilante = None
+            self.logger.error("Error al vigilar el directorio: %s", e)
+            self.ui.show_message(f"❌ No se pudo vigilar el directorio: {str(e)}", "error")
+
+    def _detener_vigilancia(self):
+        """Deja de vigilar el directorio cargado"""
+        if self._vigilante is not None:
+            self._vigilante.detener()
+            self._vigilante = None
+
+    def _procesar_cola_vigilancia(self):
+        """Aplica al árbol y al preview los lotes de cambios detectados"""
+        vigilante = self._vigilante
+        if vigilante is None:
+            return
             
+        try:
+            while True:
+                self._aplicar_cambios(vigilante.cola.get_nowait())
+                if self._vigilante is not vigilante:
+                    return
+        except queue.Empty:
+            pass
         except Exception as e:
-            self.logger.error(f"Error al convertir directorio: {str(e)}")
-            self.ui.show_message(f"❌ Error al procesar el directorio: {str(e)}", "error")
+            self.logger.error("Error aplicando cambios del directorio: %s", e)
+            self.ui.show_message(f"❌ Error al actualizar la estructura: {str(e)}", "error")
+            self._detener_vigilancia()
+            return
+            
+        self.window.after(self.INTERVALO_VIGILANCIA_MS, self._procesar_cola_vigilancia)
+
+    def _aplicar_cambios(self, rel_dirs):
+        """
+        Vuelve a listar solo los directorios cambiados y reemplaza en el preview las
+        líneas de sus subárboles. Si el preview fue editado a mano no se toca.
+        """
+        arbol = self._arbol_actual
+        if None in rel_dirs or not os.path.isdir(self._ultimo_directorio):
+            # Se perdieron eventos o desapareció la raíz: escanear de nuevo
+            self._detener_vigilancia()
+            self.ui.show_message("⚠️ Cambios masivos en el directorio: vuelve a cargarlo", "warning")
+            return
+            
+        exclusiones, seguir_enlaces = self._opciones_arbol
+        usar_iconos = self.usar_iconos.get()
+        parchear = (not self._preview_editado()
+                    and not self._filtro
+                    and len(rel_dirs) <= self.MAX_PARCHES_PREVIEW
+                    and '' not in rel_dirs and arbol.hijos)
+        nuevos = []
+        
+        # Primero los ancestros, para ubicar los subárboles con el árbol ya actualizado
+        for rel_dir in sorted(rel_dirs, key=lambda r: (r.count('/'), r)):
+            if parchear:
+                ubicacion = arbol.ubicar(rel_dir)
+                if ubicacion is None:
+                    continue
+                nodo, linea, ultimos = ubicacion
+                cantidad = nodo.contar_descendientes()
+            else:
+                nodo = arbol.buscar(rel_dir)
+                if nodo is None:
+                    continue
+            try:
+                nuevos.extend(nodo.actualizar(self._ultimo_directorio, rel_dir, exclusiones, seguir_enlaces))
+            except OSError:
+                continue  # Se borró; lo refleja el listado de su padre
+            if parchear:
+                self._reemplazar_lineas(
+                    linea + 2, cantidad, FileHandler.lineas_subarbol(nodo, ultimos, usar_iconos)
+                )
+                
+        # Los ids del índice son posiciones en el árbol: se vuelve a indexar
+        self._indice = self._indexar(arbol)
+        if self._filtro and not self._preview_editado():
+            self.buscar_en_estructura(self._filtro)
+        elif not parchear and not self._preview_editado():
+            self.actualizar_preview()
+        self._marcar_preview_limpio()
+        self._vigilante.vigilar(nuevos)
+        self.logger.info("Estructura actualizada: %d directorios cambiados", len(rel_dirs))
+
+    def _preview_editado(self):
+        """Indica si el usuario editó el preview desde el último renderizado"""
+        if self.ui.virtual_preview.active:
+            return self.ui.virtual_preview.edited
+        return self.preview_text.edit_modified()
+
+    def _marcar_preview_limpio(self):
+        """Marca el preview como no editado tras actualizarlo desde el programa"""
+        self.preview_text.edit_modified(False)
+        if self.ui.virtual_preview.active:
+            self.ui.virtual_preview.mark_clean()
+
+    def _reemplazar_lineas(self, inicio, cantidad, lineas):
+        """Reemplaza `cantidad` líneas del preview desde la línea `inicio` (base 1) por `lineas`"""
+        if self.ui.virtual_preview.active:
+            self.ui.virtual_preview.replace(inicio - 1, cantidad, list(lineas))
+            return
+        # Se borra desde el final de la línea anterior para cubrir también el final del documento
+        self.preview_text.delete(f"{inicio - 1}.end", f"{inicio + cantidad - 1}.end")
+        self.preview_text.mark_set('parche', f"{inicio - 1}.end")
+        self.preview_text.mark_gravity('parche', tk.RIGHT)
+        insertadas = 0
+        for lote in FileHandler.lotes(lineas, 5000):
+            self.preview_text.insert('parche', "".join("\n" + linea for linea in lote))
+            insertadas += len(lote)
+        self.preview_text.mark_unset('parche')
+        self.ui.highlighter.on_edit(inicio, inicio + insertadas - 1)
 
     def crear_desde_estructura(self):
         """Crea directorios desde la estructura en el preview"""
@@ -140,49 +551,106 @@ class ConvertidorDirectorios:
                 self.ui.show_message("⚠️ No hay estructura para crear. Pega una estructura válida primero.", "warning")
                 return
                 
-            if not FileHandler.validar_estructura_markdown(estructura):
-                self.ui.show_message("❌ La estructura no está en formato markdown válido. Usa los símbolos └── y ├── correctamente.", "error")
+            # Se analiza una sola vez: la validación y la creación usan el mismo resultado
+            analisis = analizar_estructura(estructura)
+            if not analisis.es_valida:
+                detalle = ""
+                if analisis.errores:
+                    numero, mensaje = analisis.errores[0]
+                    detalle = f" (línea {numero}: {mensaje})"
+                self.ui.show_message(f"❌ La estructura no está en formato markdown válido{detalle}. Usa los símbolos └── y ├── correctamente.", "error")
                 return
                 
             dest_dir = filedialog.askdirectory(title="Seleccionar Directorio Destino")
             if not dest_dir:
                 return
                 
-            self.logger.info(f"Creando estructura en: {dest_dir}")
-            Nodo.crear_estructura(estructura, dest_dir, self.usar_iconos.get())
+            # Comparar con el destino antes de tocar nada y mostrar el plan
+            plan = Nodo.planificar(analisis, dest_dir)
+            self.logger.info("Plan para %s: %s", dest_dir, plan.resumen())
+            if plan.vacio and not plan.conflictos:
+                self.ui.show_message("✅ La estructura ya existe completa en el destino", "success")
+                return
+                
+            PlanDialog(
+                self.window,
+                self.styles,
+                plan,
+                plan.lineas(FileHandler.lineas_recorrido(analisis.recorrer(), False)),
+                lambda plan: self._aplicar_plan(analisis, plan)
+            )
+            
+        except ValueError as ve:
+            self.logger.error("Error de validación: %s", ve)
+            self.ui.show_message(f"⚠️ {str(ve)}", "warning")
+        except Exception as e:
+            self.logger.error("Error al crear estructura: %s", e)
+            self.ui.show_message(f"❌ Error al crear la estructura: {str(e)}", "error")
+
+    def _aplicar_plan(self, analisis, plan):
+        """Crea solo las entradas que el plan marcó como faltantes"""
+        try:
+            self.logger.info("Creando estructura en: %s", plan.base_path)
+            resultado = Nodo.crear_estructura(
+                analisis, plan.base_path, self.usar_iconos.get(),
+                workers=self.settings.get('scan_workers', 8), plan=plan
+            )
             self.logger.info("Estructura creada exitosamente")
-            self.ui.show_message("✅ Estructura creada correctamente", "success")
+            total = resultado['directorios'] + resultado['archivos']
+            self.ui.show_message(
+                f"✅ Estructura creada correctamente: {total:,} entradas nuevas en {resultado['segundos']:.1f}s "
+                f"({resultado['existentes']:,} ya existían)", "success"
+            )
             
         except ValueError as ve:
-            self.logger.error(f"Error de validación: {str(ve)}")
+            self.logger.error("Error de validación: %s", ve)
             self.ui.show_message(f"⚠️ {str(ve)}", "warning")
         except Exception as e:
-            self.logger.error(f"Error al crear estructura: {str(e)}")
+            self.logger.error("Error al crear estructura: %s", e)
             self.ui.show_message(f"❌ Error al crear la estructura: {str(e)}", "error")
 
+    def _insertar_lineas(self, lineas):
+        """
+        Inserta líneas al final del preview por lotes, sin construir el documento completo.
+        Al superar el umbral de líneas el preview pasa a modo virtual y las siguientes
+        solo se agregan al documento, sin cargarlas en el widget.
+        """
+        vista = self.ui.virtual_preview
+        umbral = self.settings.get('umbral_preview_virtual', 20000)
+        for lote in FileHandler.lotes(lineas, 5000):
+            if vista.active:
+                vista.append(lote)
+                continue
+            separador = "\n" if self.preview_text.compare("end-1c", "!=", "1.0") else ""
+            self.preview_text.insert(tk.END, separador + "\n".join(lote))
+            if umbral and int(self.preview_text.index("end-1c").split('.')[0]) > umbral:
+                self.preview_text.edit_modified(False)
+                vista.activate(self.preview_text.get("1.0", "end-1c").split("\n"))
+
     def actualizar_preview(self):
         """Actualiza el área de preview"""
         if not hasattr(self, 'preview_text'):
             return
             
-        current_text = self._get_preview_content()
-        
-        # Si tenemos una estructura cargada desde un directorio, regenerarla
-        if hasattr(self, '_ultimo_directorio') and self._ultimo_directorio:
+        # Durante un escaneo el preview recibe los resultados parciales
+        if self._escaneo is not None:
+            return
+            
+        # Si tenemos un árbol cargado desde un directorio, volver a renderizarlo
+        if self._arbol_actual is not None:
+            self.ui.virtual_preview.deactivate()
+            self.ui.reset_editor_marks()
+            self.preview_text.delete("1.0", tk.END)
             try:
-                if self.usar_iconos.get():
-                    self.estructura_actual = FileHandler.generar_estructura_iconos(self._ultimo_directorio)
-                else:
-                    self.estructura_actual = FileHandler.generar_estructura_arbol(self._ultimo_directorio)
+                self._insertar_lineas(self._lineas_arbol_actual())
             except Exception as e:
-                self.logger.error(f"Error regenerando estructura: {str(e)}")
-        
-        self.preview_text.delete("1.0", tk.END)
-        
-        if self.estructura_actual:
-            self.preview_text.insert("1.0", self.estructura_actual)
+                self.logger.error("Error regenerando estructura: %s", e)
             self.preview_text.configure(fg=self.styles.current_theme['preview_fg'])
-        elif not current_text:
+            self._marcar_preview_limpio()
+        elif not self._get_preview_content():
+            self.ui.virtual_preview.deactivate()
+            self.ui.reset_editor_marks()
+            self.preview_text.delete("1.0", tk.END)
             self.preview_text.insert("1.0", "Pega aquí tu estructura o carga un directorio...")
             self.preview_text.configure(fg='gray')
 
@@ -197,19 +665,87 @@ class ConvertidorDirectorios:
             else:
                 self.ui.show_message("⚠️ No hay estructura para copiar", "warning")
         except Exception as e:
-            self.logger.error(f"Error al copiar al portapapeles: {str(e)}")
+            self.logger.error("Error al copiar al portapapeles: %s", e)
             self.ui.show_message("❌ No se pudo copiar al portapapeles", "error")
 
+    def _preview_muestra_arbol(self):
+        """Indica si el editor muestra el árbol cargado tal cual se renderizó"""
+        return self._arbol_actual is not None and self._escaneo is None and not self._preview_editado()
+
+    def _lineas_preview(self):
+        """
+        Líneas de lo que muestra el editor, sin copiar el documento: si es el árbol
+        cargado sin ediciones se renderizan desde el modelo, y si el editor está
+        virtualizado se recorren sus líneas
+        """
+        if self._preview_muestra_arbol():
+            return self._lineas_arbol_actual()
+        if self.ui.virtual_preview.active:
+            return self.ui.virtual_preview.iter_lines()
+        return iter(self._get_preview_content().split('\n'))
+
+    def _instantanea_preview(self):
+        """Ruta de la instantánea cargada si el editor la muestra completa (sin filtro ni ediciones), o None"""
+        if self._instantanea_actual is None or not self._preview_muestra_arbol():
+            return None
+        if self._filtro and self._indice is not None and self._indice.listo:
+            return None
+        return self._instantanea_actual
+
+    def _exportar_preview(self, filename, formato):
+        """
+        Guarda lo que muestra el editor en un formato de datos. El árbol cargado se
+        exporta desde el modelo (o desde su instantánea), con los tamaños de los
+        archivos; un texto editado se analiza primero y debe ser válido.
+        """
+        origen = self._instantanea_preview()
+        if origen is not None:
+            with Instantanea(origen) as instantanea:
+                exportar(filename, formato, instantanea.recorrer(), instantanea.raiz)
+            return
+        if self._preview_muestra_arbol():
+            exportar(filename, formato, self._recorrido_arbol_actual(),
+                     self._arbol_actual.nombre, self._ultimo_directorio)
+            return
+        analisis = analizar_estructura('\n'.join(self._lineas_preview()))
+        if analisis.errores:
+            numero, mensaje = analisis.errores[0]
+            raise ValueError(f"Línea {numero}: {mensaje}")
+        exportar(filename, formato, analisis.recorrer(), 'estructura')
+
+    def _guardar_instantanea(self, filename):
+        """
+        Guarda lo que muestra el editor como instantánea binaria. El árbol cargado
+        incluye tamaños y fechas leídos del directorio (o los de su instantánea); un
+        texto editado se analiza y se guarda sin ellos.
+        """
+        origen = self._instantanea_preview()
+        if origen is not None:
+            if os.path.abspath(filename) == os.path.abspath(origen):
+                return  # Ya contiene exactamente lo que se muestra
+            with Instantanea(origen) as instantanea:
+                guardar_instantanea(filename, instantanea.recorrer(), instantanea.raiz,
+                                    origen=instantanea.origen)
+            return
+        if self._preview_muestra_arbol():
+            guardar_instantanea(filename, self._recorrido_arbol_actual(),
+                                self._arbol_actual.nombre, self._ultimo_directorio)
+            return
+        analisis = analizar_estructura('\n'.join(self._lineas_preview()))
+        if analisis.errores:
+            numero, mensaje = analisis.errores[0]
+            raise ValueError(f"Línea {numero}: {mensaje}")
+        guardar_instantanea(filename, analisis.recorrer(), 'estructura', metadatos=False)
+
     def guardar_estructura(self):
-        """Guarda la estructura en un archivo"""
+        """Guarda la estructura en un archivo, escribiéndola a medida que se genera"""
         try:
-            estructura = self._get_preview_content()
-            if not estructura:
+            if not any(linea.strip() for linea in self._lineas_preview()):
                 self.ui.show_message("⚠️ No hay estructura para guardar", "warning")
                 return
                 
-            # Validar la estructura antes de guardar
-            if not self._validate_preview_content():
+            # Validar la estructura antes de guardar; la salida del escáner ya es válida
+            if not self._preview_muestra_arbol() and not self.ui.validate_now():
                 response = messagebox.askyesno(
                     "Advertencia",
                     "La estructura actual no tiene el formato correcto.\n\n" +
@@ -224,18 +760,31 @@ class ConvertidorDirectorios:
                 filetypes=[
                     ("Archivo Markdown", "*.md"),
                     ("Archivo de texto", "*.txt"),
+                    ("Markdown comprimido", "*.md.gz *.md.xz *.md.zst"),
+                    ("JSON", "*.json"),
+                    ("NDJSON (una entrada por línea)", "*.ndjson *.jsonl"),
+                    ("CSV", "*.csv"),
+                    ("Página HTML", "*.html"),
+                    ("Instantánea binaria", f"*{EXTENSION_INSTANTANEA}"),
                     ("Todos los archivos", "*.*")
                 ],
                 title="Guardar Estructura"
             )
             
             if filename:
-                FileHandler.guardar_estructura(filename, estructura, self.usar_iconos.get())
-                self.logger.info(f"Estructura guardada en: {filename}")
+                # Las líneas se piden después del diálogo: mientras está abierto el árbol puede cambiar
+                formato = formato_por_extension(filename)
+                if filename.lower().endswith(EXTENSION_INSTANTANEA):
+                    self._guardar_instantanea(filename)
+                elif formato is None:
+                    FileHandler.guardar_estructura(filename, self._lineas_preview(), self.usar_iconos.get())
+                else:
+                    self._exportar_preview(filename, formato)
+                self.logger.info("Estructura guardada en: %s", filename)
                 self.ui.show_message(f"✅ Estructura guardada en {filename}", "success")
                 
         except Exception as e:
-            self.logger.error(f"Error al guardar estructura: {str(e)}")
+            self.logger.error("Error al guardar estructura: %s", e)
             self.ui.show_message(f"❌ Error al guardar la estructura: {str(e)}", "error")
 
     def run(self):
@@ -265,7 +814,9 @@ class ConvertidorDirectorios:
         
         # Guardar preferencias al cerrar
         def on_closing():
+            self._detener_vigilancia()
             self.settings.set('usar_iconos', self.usar_iconos.get())
+            self.settings.set('vigilar_cambios', self.vigilar_cambios.get())
             self.settings.set('window_size', self.window.geometry().split('+')[0])
             self.settings.save_settings()
             self.window.destroy()
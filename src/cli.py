@@ -0,0 +1,296 @@
+"""
+Interfaz de línea de comandos sin interfaz gráfica: python -m src <comando> ...
+
+Solo importa el núcleo (FileHandler, Nodo y el analizador de estructuras), así que
+arranca rápido y funciona sin Tkinter ni pantalla, por ejemplo en CI o en scripts.
+"""
+
+import argparse
+import locale
+import logging
+import os
+import sys
+import time
+
+from .utils.file_handler import FileHandler, Nodo
+from .utils.structure_parser import analizar_estructura
+from .utils.exclusion import Exclusiones
+from .utils.batch import expandir_raices, convertir_lote
+from .utils.renderers import FORMATOS, formato_por_extension, renderizar
+from .utils.scanner import recorrer_paralelo
+from .utils.snapshot import EXTENSION as EXTENSION_INSTANTANEA, Instantanea, es_instantanea, guardar_instantanea
+
+logger = logging.getLogger('ConvertidorDirectorios')
+
+
+def _leer_entrada(ruta: str) -> str:
+    """Texto de una estructura desde un archivo o desde stdin ('-')"""
+    if ruta == '-':
+        return sys.stdin.read()
+    with open(ruta, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _escribir_salida(ruta, lineas):
+    """Escribe las líneas en un archivo (comprimido según la extensión) o en stdout, sin armar el documento"""
+    if ruta is None or ruta == '-':
+        FileHandler.escribir_lineas(sys.stdout, lineas)
+        sys.stdout.write("\n")
+        return
+    with FileHandler.abrir_salida(ruta) as f:
+        FileHandler.escribir_lineas(f, lineas)
+        f.write("\n")
+
+
+def _analizar(args):
+    """Analiza la estructura de entrada; si tiene errores los informa y sale"""
+    analisis = analizar_estructura(_leer_entrada(args.entrada))
+    if not analisis.es_valida:
+        for numero, mensaje in analisis.errores:
+            print(f"{args.entrada}:{numero}: {mensaje}", file=sys.stderr)
+        if not analisis.entradas:
+            print(f"{args.entrada}: la estructura no contiene entradas", file=sys.stderr)
+        sys.exit(1)
+    return analisis
+
+
+def _formato(args) -> str:
+    """Formato pedido con --formato o --iconos, o el que indica la extensión de -o"""
+    if args.formato:
+        return args.formato
+    if args.iconos:
+        return 'iconos'
+    salida = getattr(args, 'salida', None)
+    return (salida and formato_por_extension(salida)) or 'arbol'
+
+
+def _opciones_exclusion(args, formato: str):
+    """
+    (patrones, usar_gitignore) del escaneo. Los formatos que muestran todo (tree) no
+    aplican los patrones por defecto ni los .gitignore salvo que se pidan con
+    --excluir o --gitignore.
+    """
+    if FORMATOS[formato].muestra_todo:
+        return args.excluir or [], args.gitignore and not args.sin_gitignore
+    return args.excluir, not args.sin_gitignore
+
+
+def comando_escanear(args):
+    """Escanea un directorio y escribe su estructura"""
+    formato = _formato(args)
+    patrones, usar_gitignore = _opciones_exclusion(args, formato)
+    exclusiones = Exclusiones(patrones, usar_gitignore=usar_gitignore)
+    recorrido = recorrer_paralelo(args.directorio, exclusiones, args.workers, args.seguir_enlaces,
+                                  orden=FORMATOS[formato].orden, todas=FORMATOS[formato].muestra_todo)
+    _escribir_salida(args.salida, renderizar(formato, recorrido, args.directorio))
+
+
+def comando_lote(args):
+    """Convierte muchos directorios en archivos de estructura, en paralelo"""
+    patrones = list(args.raices)
+    if args.lista:
+        patrones += [linea.strip() for linea in _leer_entrada(args.lista).splitlines() if linea.strip()]
+    raices, omitidas = expandir_raices(patrones)
+    for ruta in omitidas:
+        print(f"{ruta}: no es un directorio, se omite", file=sys.stderr)
+    if not raices:
+        raise ValueError("Ningún directorio coincide con las raíces indicadas")
+
+    inicio = time.perf_counter()
+    fallidos = 0
+    entradas = 0
+    formato = _formato(args)
+    patrones, usar_gitignore = _opciones_exclusion(args, formato)
+    for resultado in convertir_lote(raices, args.destino, formato, args.comprimir, patrones,
+                                    usar_gitignore, args.procesos, args.workers, args.seguir_enlaces):
+        if resultado['error']:
+            fallidos += 1
+            print(f"{resultado['segundos']:8.2f}s  ERROR  {resultado['raiz']}: {resultado['error']}")
+        else:
+            entradas += resultado['entradas']
+            print(f"{resultado['segundos']:8.2f}s  {resultado['entradas']:>10,}  "
+                  f"{resultado['raiz']} -> {resultado['archivo']}")
+        sys.stdout.flush()
+
+    omitidas_texto = f", {len(omitidas)} omitidas" if omitidas else ""
+    print(f"{len(raices) - fallidos} de {len(raices)} directorios convertidos ({entradas:,} entradas) "
+          f"en {time.perf_counter() - inicio:.2f}s{omitidas_texto}", file=sys.stderr)
+    # Una raíz nombrada explícitamente que no se pudo escanear es un error, aunque el resto se convierta
+    if fallidos or omitidas:
+        sys.exit(1)
+
+
+def comando_instantanea(args):
+    """Escanea un directorio y lo guarda como instantánea binaria"""
+    salida = args.salida or os.path.basename(os.path.normpath(os.path.abspath(args.directorio))) + EXTENSION_INSTANTANEA
+    exclusiones = Exclusiones(args.excluir, usar_gitignore=not args.sin_gitignore)
+    inicio = time.perf_counter()
+    recorrido = recorrer_paralelo(args.directorio, exclusiones, args.workers, args.seguir_enlaces)
+    total = guardar_instantanea(salida, recorrido, args.directorio, metadatos=not args.sin_metadatos,
+                                origen=args.directorio)
+    print(f"{salida}: {total:,} entradas en {time.perf_counter() - inicio:.2f}s", file=sys.stderr)
+
+
+def comando_renderizar(args):
+    """Vuelve a dibujar una estructura (o una instantánea) en el formato elegido"""
+    if args.entrada != '-' and es_instantanea(args.entrada):
+        with Instantanea(args.entrada) as instantanea:
+            indice, raiz = None, instantanea.raiz
+            if args.subarbol:
+                try:
+                    indice = instantanea.buscar(args.subarbol)
+                except KeyError:
+                    raise ValueError(f"{args.subarbol}: no existe en {args.entrada}") from None
+                if indice is not None:
+                    if not instantanea.entrada(indice).es_directorio:
+                        raise ValueError(f"{args.subarbol}: no es un directorio")
+                    raiz = f"{raiz}/{args.subarbol.strip('/')}"
+            _escribir_salida(args.salida, renderizar(_formato(args), instantanea.recorrer(indice), raiz))
+        return
+    if args.subarbol:
+        raise ValueError("--subarbol solo se puede usar con una instantánea")
+    analisis = _analizar(args)
+    _escribir_salida(args.salida, renderizar(_formato(args), analisis.recorrer(), '.'))
+
+
+def comando_normalizar(args):
+    """Escribe una estructura en el formato de árbol que usa la aplicación"""
+    analisis = _analizar(args)
+    _escribir_salida(args.salida, FileHandler.lineas_recorrido(analisis.recorrer(), False))
+
+
+def comando_validar(args):
+    """Comprueba una estructura; el código de salida indica si es válida"""
+    analisis = _analizar(args)
+    print(f"{args.entrada}: estructura válida ({len(analisis.entradas):,} entradas)")
+
+
+def comando_crear(args):
+    """Crea en el destino lo que falta de una estructura"""
+    analisis = _analizar(args)
+    plan = Nodo.planificar(analisis, args.destino)
+
+    if args.simular or plan.conflictos:
+        _escribir_salida(None, plan.lineas(FileHandler.lineas_recorrido(analisis.recorrer(), False)))
+    for ruta, mensaje in plan.conflictos:
+        print(f"{ruta}: {mensaje}", file=sys.stderr)
+    print(plan.resumen(), file=sys.stderr)
+    if plan.conflictos:
+        sys.exit(1)
+    if args.simular or plan.vacio:
+        return
+
+    resultado = Nodo.crear_estructura(analisis, args.destino, False, args.workers, plan)
+    print(f"Creados {resultado['directorios']:,} directorios y {resultado['archivos']:,} archivos "
+          f"en {resultado['segundos']:.2f}s", file=sys.stderr)
+
+
+def crear_parser() -> argparse.ArgumentParser:
+    """Parser de argumentos de la línea de comandos"""
+    parser = argparse.ArgumentParser(
+        prog='python -m src',
+        description="Convertidor de estructuras de directorios (sin interfaz gráfica)"
+    )
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="muestra el registro de la operación en stderr")
+    comandos = parser.add_subparsers(dest='comando', metavar='comando', required=True)
+
+    escanear = comandos.add_parser('escanear', aliases=['scan'], help="escanea un directorio")
+    escanear.add_argument('directorio')
+    escanear.set_defaults(funcion=comando_escanear, workers=8)
+
+    lote = comandos.add_parser('lote', aliases=['batch'],
+                               help="convierte muchos directorios en archivos de estructura en paralelo")
+    lote.add_argument('raices', nargs='*', metavar='RAIZ', help="directorios o patrones glob")
+    lote.add_argument('--lista', metavar='ARCHIVO',
+                      help="archivo con una raíz (o patrón) por línea ('-' para stdin)")
+    lote.add_argument('-d', '--destino', default='.', help="directorio de los .md (por defecto el actual)")
+    lote.add_argument('--comprimir', choices=('gz', 'xz', 'zst'),
+                      help="comprime los archivos al vuelo (.md.gz, .json.xz...)")
+    lote.add_argument('--procesos', type=int, default=None,
+                      help="raíces escaneadas a la vez (por defecto una por núcleo)")
+    lote.set_defaults(funcion=comando_lote, workers=1)
+
+    instantanea = comandos.add_parser('instantanea', aliases=['snapshot'],
+                                      help=f"escanea un directorio a una instantánea binaria ({EXTENSION_INSTANTANEA})")
+    instantanea.add_argument('directorio')
+    instantanea.add_argument('-o', '--salida', metavar='ARCHIVO',
+                             help=f"archivo de la instantánea (por defecto <directorio>{EXTENSION_INSTANTANEA})")
+    instantanea.add_argument('--sin-metadatos', action='store_true',
+                             help="no guardar tamaños ni fechas (evita un stat por entrada)")
+    instantanea.set_defaults(funcion=comando_instantanea, workers=8)
+
+    renderizar = comandos.add_parser('renderizar', aliases=['render'],
+                                     help="dibuja una estructura o una instantánea en otro formato (iconos, json, csv, html, tree...)")
+    renderizar.add_argument('--subarbol', metavar='RUTA',
+                            help="con una instantánea, solo lo que hay debajo de RUTA (p. ej. src/utils)")
+    renderizar.set_defaults(funcion=comando_renderizar)
+
+    normalizar = comandos.add_parser('normalizar', aliases=['normalize'],
+                                     help="convierte una estructura al formato de árbol")
+    normalizar.set_defaults(funcion=comando_normalizar)
+
+    validar = comandos.add_parser('validar', aliases=['validate'],
+                                  help="valida una estructura (código de salida 1 si no es válida)")
+    validar.set_defaults(funcion=comando_validar)
+
+    crear = comandos.add_parser('crear', aliases=['create'], help="crea una estructura en un destino")
+    crear.add_argument('destino')
+    crear.add_argument('--simular', '--dry-run', action='store_true',
+                       help="muestra el plan (+ crear, = existe, ! conflicto) sin tocar el disco")
+    crear.add_argument('--workers', type=int, default=8, help="hilos para crear entradas")
+    crear.set_defaults(funcion=comando_crear)
+
+    for sub in (escanear, lote, instantanea):
+        sub.add_argument('--excluir', nargs='*', metavar='PATRON',
+                         help="patrones estilo .gitignore (por defecto .git, __pycache__, node_modules...)")
+        sub.add_argument('--sin-gitignore', action='store_true',
+                         help="no aplicar los .gitignore encontrados")
+        sub.add_argument('--workers', type=int, default=sub.get_default('workers'),
+                         help="listados de directorio simultáneos por raíz (1 = en serie)")
+        sub.add_argument('--seguir-enlaces', action='store_true',
+                         help="recorrer enlaces simbólicos a directorios")
+    for sub in (escanear, lote):
+        sub.add_argument('--gitignore', action='store_true',
+                         help="con --formato tree, aplicar los .gitignore (como tree --gitignore)")
+    for sub in (renderizar, normalizar, validar, crear):
+        sub.add_argument('entrada', nargs='?', default='-',
+                         help="archivo con la estructura ('-' o nada para stdin); renderizar acepta instantáneas")
+    for sub in (escanear, renderizar, normalizar):
+        sub.add_argument('-o', '--salida', metavar='ARCHIVO', help="archivo de salida; con .gz, .xz o .zst se comprime (por defecto stdout)")
+    for sub in (escanear, lote, renderizar):
+        sub.add_argument('--iconos', action='store_true', help="formato con iconos (igual que --formato iconos)")
+        sub.add_argument('--formato', choices=list(FORMATOS),
+                         help="; ".join(f"{f.nombre}: {f.descripcion}" for f in FORMATOS.values())
+                         + " (por defecto según la extensión de -o, o arbol)")
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """Punto de entrada de la línea de comandos"""
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+
+    # Como tree, ordenar los nombres según la configuración regional
+    try:
+        locale.setlocale(locale.LC_COLLATE, '')
+    except locale.Error:
+        pass
+
+    # Sin -v solo se ven los mensajes de la propia línea de comandos
+    logging.basicConfig(format='%(levelname)s: %(message)s', stream=sys.stderr)
+    logger.setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+
+    try:
+        args.funcion(args)
+    except BrokenPipeError:
+        # La salida se cortó (p. ej. con | head): no es un error
+        sys.stdout = open(os.devnull, 'w')
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 0
@@ -2,6 +2,8 @@ import json
 import os
 from datetime import datetime
 
+from ..utils.exclusion import EXCLUSIONES_POR_DEFECTO
+
 class Settings:
     def __init__(self):
         self.config_file = 'preferencias.json'
@@ -13,6 +15,13 @@ class Settings:
             'ui_font_family': 'Segoe UI',  # Fuente para la UI
             'ui_font_size': 10,  # Tamaño de fuente para la UI
             'window_size': '1000x700',
+            'scan_workers': 8,  # Listados de directorio simultáneos (1 = escaneo en serie)
+            'seguir_enlaces': False,  # Recorrer enlaces simbólicos a directorios (con detección de ciclos)
+            'exclusiones': list(EXCLUSIONES_POR_DEFECTO),  # Patrones estilo .gitignore
+            'usar_gitignore': True,  # Respetar los .gitignore encontrados al escanear
+            'usar_cache_escaneo': True,  # Reutilizar listados de directorios sin cambios entre escaneos
+            'vigilar_cambios': False,  # Actualizar la estructura cuando cambia el directorio cargado
+            'umbral_preview_virtual': 20000,  # Líneas a partir de las cuales el editor carga solo lo visible (0 = nunca)
             'ultima_actualizacion': datetime.now().isoformat()
         }
         self.current_settings = {}
@@ -1,15 +1,37 @@
+import logging
 import re
 import tkinter as tk
 from tkinter import ttk
-from venv import logger
+
+from .virtual_preview import VirtualPreview
+from .highlighter import TreeHighlighter
+from .tree_explorer import TreeExplorer
+from ..utils.structure_parser import AnalisisIncremental
+
+logger = logging.getLogger('ConvertidorDirectorios')
+
 
 class UIComponents:
+    VALIDATION_DELAY_MS = 400  # Pausa al escribir antes de validar el editor
+    SEARCH_DELAY_MS = 150  # Pausa al escribir en el buscador antes de filtrar
+    ERROR_TAG = 'error_estructura'
+
     def __init__(self, parent, styles, callbacks):
         self.parent = parent
         self.styles = styles
         self.callbacks = callbacks
         self.message_label = None
+        self._message_timer = None
+        self.cancel_button = None
         self.preview_placeholder = 'Pega aquí tu estructura o carga un directorio...'
+        self._validation_job = None
+        self._editor_analysis = AnalisisIncremental()
+        self._error_lines = {}  # Número de línea del documento -> mensaje
+        self._hovered_error_line = None
+        self._press_line = None  # Línea del cursor al empezar a editar con el teclado
+        self._search_job = None
+        self._applied_search = ''
+        self.search_var = tk.StringVar()
         
     def create_title_section(self):
         """Crea la sección del título"""
@@ -43,7 +65,7 @@ class UIComponents:
         
         return titulo_frame
 
-    def create_options_section(self, usar_iconos_var):
+    def create_options_section(self, usar_iconos_var, vigilar_var=None):
         """Crea la sección de opciones"""
         opciones_frame = ttk.LabelFrame(
             self.parent,
@@ -66,6 +88,20 @@ class UIComponents:
         )
         checkbox.pack(side=tk.LEFT, padx=5)
         
+        if vigilar_var is not None:
+            vigilar_checkbox = ttk.Checkbutton(
+                left_frame,
+                text="Vigilar cambios",
+                variable=vigilar_var,
+                command=self.callbacks['alternar_vigilancia'],
+                style='TCheckbutton'
+            )
+            vigilar_checkbox.pack(side=tk.LEFT, padx=5)
+            self._create_tooltip(
+                vigilar_checkbox,
+                "Actualiza la estructura cuando cambian los archivos del directorio cargado"
+            )
+        
         # Tooltip o ayuda
         ttk.Label(
             left_frame,
@@ -87,6 +123,11 @@ class UIComponents:
                 "command": self.callbacks['convertir_directorio'],
                 "desc": "Selecciona una carpeta para convertir su estructura"
             },
+            {
+                "text": "🌳 Explorar Directorio",
+                "command": self.callbacks['explorar_directorio'],
+                "desc": "Navega una carpeta grande listando solo lo que expandes"
+            },
             {
                 "text": "🔨 Crear Estructura",
                 "command": self.callbacks['crear_desde_estructura'],
@@ -114,8 +155,33 @@ class UIComponents:
             )
             desc_label.pack(anchor=tk.W)
         
+        # Botón para detener un escaneo en curso (solo activo mientras se escanea)
+        cancel_frame = ttk.Frame(botones_frame, style='TFrame')
+        cancel_frame.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_button = ttk.Button(
+            cancel_frame,
+            text="⏹️ Cancelar",
+            style='Custom.TButton',
+            command=self.callbacks['cancelar_escaneo']
+        )
+        self.cancel_button.pack(anchor=tk.W)
+        self.cancel_button.state(['disabled'])
+        
+        ttk.Label(
+            cancel_frame,
+            text="Detiene el escaneo conservando lo ya leído",
+            style='Custom.TLabel',
+            font=('Segoe UI', 8)
+        ).pack(anchor=tk.W)
+        
         return botones_frame
 
+    def set_scanning(self, activo):
+        """Activa o desactiva el botón de cancelar según haya un escaneo en curso"""
+        if self.cancel_button:
+            self.cancel_button.state(['!disabled'] if activo else ['disabled'])
+
     def create_preview_section(self):
         """Crea la sección de vista previa/editor"""
         preview_container = ttk.LabelFrame(
@@ -150,9 +216,37 @@ class UIComponents:
         self.message_frame = ttk.Frame(preview_container, style='TFrame')
         self.message_frame.pack(fill=tk.X, pady=(0, 5))
         
-        # Área de texto con frame personalizado
-        text_frame = ttk.Frame(preview_container, style='Preview.TFrame')
-        text_frame.pack(fill=tk.BOTH, expand=True)
+        # Buscador sobre la estructura cargada
+        search_frame = ttk.Frame(preview_container, style='TFrame')
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(search_frame, text="🔍 Buscar:", style='Custom.TLabel').pack(side=tk.LEFT)
+        search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=40)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind('<KeyRelease>', self._on_search_key)
+        search_entry.bind('<Return>', lambda e: self._run_search())
+        search_entry.bind('<Escape>', lambda e: self._clear_and_search())
+        self._create_tooltip(
+            search_entry,
+            "Filtra la estructura cargada por nombre: texto (p. ej. util) o patrón (*.py, test_*)"
+        )
+        ttk.Button(
+            search_frame,
+            text="✖",
+            width=3,
+            command=self._clear_and_search
+        ).pack(side=tk.LEFT)
+        
+        # Explorador (oculto hasta que se explora un directorio) y área de texto
+        self._preview_paned = ttk.PanedWindow(preview_container, orient=tk.HORIZONTAL)
+        self._preview_paned.pack(fill=tk.BOTH, expand=True)
+        self.explorer = TreeExplorer(self._preview_paned, {
+            'exportar': self.callbacks['exportar_explorador'],
+            'cerrar': self.hide_explorer
+        })
+        
+        text_frame = ttk.Frame(self._preview_paned, style='Preview.TFrame')
+        self._preview_paned.add(text_frame, weight=3)
         
         # Barra de herramientas mejorada
         toolbar = ttk.Frame(text_frame, style='TFrame')
@@ -202,13 +296,26 @@ class UIComponents:
         # Scrollbars
         y_scrollbar = ttk.Scrollbar(text_frame, orient="vertical", command=self.preview_text.yview)
         x_scrollbar = ttk.Scrollbar(text_frame, orient="horizontal", command=self.preview_text.xview)
-        self.preview_text.configure(yscrollcommand=y_scrollbar.set, xscrollcommand=x_scrollbar.set)
+        self.preview_text.configure(yscrollcommand=self._on_preview_yview, xscrollcommand=x_scrollbar.set)
+        self._y_scrollbar = y_scrollbar
         
         # Empaquetar elementos
         y_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         x_scrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.preview_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
+        # Modo virtual para documentos grandes (solo se activa por encima del umbral)
+        self.virtual_preview = VirtualPreview(self.preview_text, y_scrollbar)
+        self.virtual_preview.on_load = self._on_window_load
+        
+        # Resaltado de lo visible y marcas de error en línea
+        self.highlighter = TreeHighlighter(self.preview_text)
+        self.virtual_preview.on_scroll = self.highlighter.schedule
+        self.configure_editor_tags()
+        self.preview_text.tag_bind(self.ERROR_TAG, '<Enter>', self._on_error_hover)
+        self.preview_text.tag_bind(self.ERROR_TAG, '<Motion>', self._on_error_hover)
+        self.preview_text.tag_bind(self.ERROR_TAG, '<Leave>', self._on_error_leave)
+        
         # Configurar placeholder
         self.preview_text.insert('1.0', self.preview_placeholder)
         self.preview_text.configure(fg='gray')
@@ -216,6 +323,7 @@ class UIComponents:
         # Configurar eventos
         self.preview_text.bind('<FocusIn>', self._on_focus_in)
         self.preview_text.bind('<FocusOut>', self._on_focus_out)
+        self.preview_text.bind('<KeyPress>', self._on_key_press)
         self.preview_text.bind('<KeyRelease>', self._on_key_release)
         
         # Crear menú contextual mejorado
@@ -223,10 +331,50 @@ class UIComponents:
         
         return preview_container, self.preview_text
 
+    def _on_search_key(self, event):
+        """Filtra cuando se deja de escribir durante SEARCH_DELAY_MS"""
+        if self.search_var.get().strip() == self._applied_search:
+            return
+        if self._search_job is not None:
+            self.parent.after_cancel(self._search_job)
+        self._search_job = self.parent.after(self.SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        """Aplica la búsqueda escrita"""
+        if self._search_job is not None:
+            self.parent.after_cancel(self._search_job)
+            self._search_job = None
+        self._applied_search = self.search_var.get().strip()
+        self.callbacks['buscar'](self._applied_search)
+
+    def _clear_and_search(self):
+        """Vacía el buscador y vuelve a mostrar la estructura completa"""
+        self.search_var.set('')
+        self._run_search()
+
+    def clear_search(self):
+        """Vacía el buscador sin filtrar (se cargó otra estructura)"""
+        if self._search_job is not None:
+            self.parent.after_cancel(self._search_job)
+            self._search_job = None
+        self._applied_search = ''
+        self.search_var.set('')
+
+    def show_explorer(self):
+        """Muestra el panel del explorador a la izquierda del editor"""
+        if str(self.explorer.frame) not in self._preview_paned.panes():
+            self._preview_paned.insert(0, self.explorer.frame, weight=1)
+
+    def hide_explorer(self):
+        """Oculta el panel del explorador"""
+        if str(self.explorer.frame) in self._preview_paned.panes():
+            self._preview_paned.forget(self.explorer.frame)
+
     def _handle_undo(self, event):
         """Maneja el evento de deshacer"""
         try:
             self.preview_text.edit_undo()
+            self.highlighter.reset()
         except tk.TclError:  
             self.show_message("No hay más acciones para deshacer", "info", 1000)
         return "break"
@@ -235,6 +383,7 @@ class UIComponents:
         """Maneja el evento de rehacer"""
         try:
             self.preview_text.edit_redo()
+            self.highlighter.reset()
         except tk.TclError:  
             self.show_message("No hay más acciones para rehacer", "info", 1000)
         return "break"
@@ -291,9 +440,11 @@ class UIComponents:
             # Asegurar que la línea insertada sea visible
             self.preview_text.see(tk.INSERT)
             self.preview_text.focus_set()
+            self.highlighter.on_edit(line_num, line_num + 1)
+            self.schedule_validation()
             
         except Exception as e:
-            logger.error(f"Error insertando símbolo: {e}")
+            logger.error("Error insertando símbolo: %s", e)
             self.show_message("⚠️ Error al insertar símbolo", "error")
 
     def _on_focus_in(self, event):
@@ -322,19 +473,120 @@ class UIComponents:
             self.preview_text.configure(fg='gray')
             self.preview_text.insert('1.0', self.preview_placeholder)
 
+    def _on_key_press(self, event):
+        """Recuerda dónde estaba el cursor antes de que la tecla modifique el texto"""
+        if self._press_line is None:
+            self._press_line = int(self.preview_text.index(tk.INSERT).split('.')[0])
+
     def _on_key_release(self, event):
         """Maneja el evento de liberación de tecla"""
+        # Las líneas modificadas quedan entre la posición del cursor antes y después
+        line = int(self.preview_text.index(tk.INSERT).split('.')[0])
+        first = line if self._press_line is None else min(line, self._press_line)
+        last = line if self._press_line is None else max(line, self._press_line)
+        self._press_line = None
+        self.highlighter.on_edit(first, last)
+        self.schedule_validation()
+
+    def _on_preview_yview(self, first, last):
+        """yscrollcommand del editor: mueve la barra y resalta lo que pasa a verse"""
+        self._y_scrollbar.set(first, last)
+        self.highlighter.schedule()
+
+    def _on_window_load(self):
+        """En modo virtual se cargó otra ventana: volver a resaltar y marcar errores"""
+        self.highlighter.reset()
+        self._apply_error_tags()
+
+    def configure_editor_tags(self):
+        """Aplica a los tags del resaltado y de errores los colores del tema actual"""
+        self.highlighter.configure(self.styles.get_highlight_tag_config())
+        self.preview_text.tag_configure(self.ERROR_TAG, **self.styles.get_error_tag_config())
+        # Los errores se ven por encima del resaltado y la selección por encima de todo
+        self.preview_text.tag_raise(self.ERROR_TAG)
+        self.preview_text.tag_raise('sel')
+
+    def schedule_validation(self):
+        """Valida el editor cuando se deja de escribir durante VALIDATION_DELAY_MS"""
+        if self._validation_job is not None:
+            self.parent.after_cancel(self._validation_job)
+        self._validation_job = self.parent.after(self.VALIDATION_DELAY_MS, self._validate_editor)
+
+    def validate_now(self) -> bool:
+        """Valida el editor en el momento (p. ej. antes de guardar); True si la estructura es válida"""
+        if self._validation_job is not None:
+            self.parent.after_cancel(self._validation_job)
+        analysis = self._validate_editor()
+        return analysis is not None and analysis.es_valida
+
+    def reset_editor_marks(self):
+        """Descarta la validación pendiente, las marcas y el resaltado (el contenido lo genera el programa)"""
+        if self._validation_job is not None:
+            self.parent.after_cancel(self._validation_job)
+            self._validation_job = None
+        self._error_lines = {}
+        self._hovered_error_line = None
+        self.preview_text.tag_remove(self.ERROR_TAG, '1.0', tk.END)
+        self.highlighter.reset()
+
+    def _validate_editor(self):
+        """
+        Analiza el editor y marca las líneas con errores. El análisis incremental solo
+        vuelve a tokenizar las líneas que cambiaron desde la validación anterior.
+        Devuelve el análisis, o None si no se pudo analizar.
+        """
+        self._validation_job = None
         try:
-            from src.utils.file_handler import FileHandler
-            content = self.preview_text.get('1.0', 'end-1c').strip()
-            if content and content != self.preview_placeholder:
-                if not FileHandler.validar_estructura_markdown(content):
-                    self.show_message(
-                        "⚠️ La estructura actual no es válida. Usa los botones de símbolos para un formato correcto.",
-                        "warning"
-                    )
-        except Exception:
-            pass
+            if self.virtual_preview.active:
+                lines = self.virtual_preview.document_lines()
+            else:
+                content = self.preview_text.get('1.0', 'end-1c')
+                lines = [] if content.strip() == self.preview_placeholder else content.split('\n')
+            analysis = self._editor_analysis.actualizar(lines)
+        except Exception as e:
+            logger.error("Error validando la estructura: %s", e)
+            return None
+
+        self._error_lines = {}
+        for numero, mensaje in analysis.errores:
+            if numero in self._error_lines:
+                self._error_lines[numero] += f"; {mensaje}"
+            else:
+                self._error_lines[numero] = mensaje
+        self._apply_error_tags()
+        return analysis
+
+    def _apply_error_tags(self):
+        """Marca las líneas con errores que están cargadas en el widget"""
+        self.preview_text.tag_remove(self.ERROR_TAG, '1.0', tk.END)
+        if not self._error_lines:
+            return
+        offset = self.virtual_preview.start if self.virtual_preview.active else 0
+        last_line = int(self.preview_text.index('end-1c').split('.')[0])
+        ranges = []
+        for numero in self._error_lines:
+            line = numero - offset
+            if 1 <= line <= last_line:
+                ranges += (f"{line}.0", f"{line}.end")
+        if ranges:
+            # Una sola llamada a Tk para todos los rangos
+            self.preview_text.tag_add(self.ERROR_TAG, *ranges)
+
+    def _on_error_hover(self, event):
+        """Muestra el error de la línea marcada bajo el puntero"""
+        line = int(self.preview_text.index(f"@{event.x},{event.y}").split('.')[0])
+        if self.virtual_preview.active:
+            line += self.virtual_preview.start
+        if line == self._hovered_error_line:
+            return
+        self._hovered_error_line = line
+        mensaje = self._error_lines.get(line)
+        if mensaje:
+            self.show_message(f"⚠️ Línea {line}: {mensaje}", "warning", 5000)
+
+    def _on_error_leave(self, event):
+        """Permite volver a mostrar el error al regresar a la línea"""
+        self._hovered_error_line = None
 
     def _create_context_menu(self, text_widget):
         """Crea un menú contextual mejorado para el widget de texto"""
@@ -397,27 +649,20 @@ class UIComponents:
                 text_widget.edit_separator()  # Marca fin para undo
         except Exception:
             text_widget.event_generate("<<Paste>>")
+        self.highlighter.reset()
+        self.schedule_validation()
 
     def _get_preview_content(self):
             """Obtiene el contenido real del preview, ignorando el placeholder"""
             if hasattr(self, 'preview_text'):
+                if self.virtual_preview.active:
+                    return self.virtual_preview.content().strip()
                 content = self.preview_text.get("1.0", "end-1c").strip()
                 if content == self.preview_placeholder:
                     return ""
                 return content
             return ""
 
-    def _validate_preview_content(self):
-        """Valida el contenido actual del preview"""
-        try:
-            from src.utils.file_handler import FileHandler
-            content = self._get_preview_content()
-            if content:
-                return FileHandler.validar_estructura_markdown(content)
-        except Exception:
-            pass
-        return False
-
     def create_action_buttons(self):
         """Crea los botones de acción"""
         acciones_frame = ttk.Frame(self.parent, style='TFrame')
@@ -425,7 +670,9 @@ class UIComponents:
         
         buttons_config = [
             ("📋 Copiar", self.callbacks['copiar_estructura'], "Copiar al portapapeles"),
-            ("💾 Guardar", self.callbacks['guardar_estructura'], "Guardar en archivo")
+            ("💾 Guardar", self.callbacks['guardar_estructura'], "Guardar en archivo"),
+            ("📂 Abrir instantánea", self.callbacks['abrir_instantanea'],
+             "Abrir un árbol guardado como instantánea (.cdsnap) sin volver a escanear")
         ]
         
         for texto, comando, tooltip in buttons_config:
@@ -466,6 +713,7 @@ class UIComponents:
     def show_message(self, message, message_type='info', duration=3000):
         """Muestra un mensaje temporal"""
         # Limpiar mensaje anterior si existe
+        self._cancel_message_timer()
         if self.message_label:
             self.message_label.destroy()
             
@@ -479,10 +727,31 @@ class UIComponents:
         self.message_label.pack(fill=tk.X, pady=5)
         
         # Programar la eliminación del mensaje
-        self.parent.after(duration, self._clear_message)
+        self._message_timer = self.parent.after(duration, self._clear_message)
+
+    def show_progress(self, message):
+        """Muestra un mensaje persistente que se actualiza en sitio (p. ej. progreso de escaneo)"""
+        self._cancel_message_timer()
+        if self.message_label:
+            self.message_label.configure(text=message, style='Custom.TLabel')
+            return
+        self.message_label = ttk.Label(
+            self.message_frame,
+            text=message,
+            style='Custom.TLabel',
+            wraplength=800
+        )
+        self.message_label.pack(fill=tk.X, pady=5)
+
+    def _cancel_message_timer(self):
+        """Cancela la eliminación programada del mensaje anterior"""
+        if self._message_timer is not None:
+            self.parent.after_cancel(self._message_timer)
+            self._message_timer = None
         
     def _clear_message(self):
         """Limpia el mensaje actual"""
+        self._message_timer = None
         if self.message_label:
             self.message_label.destroy()
             self.message_label = None
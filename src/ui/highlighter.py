@@ -0,0 +1,123 @@
+import tkinter as tk
+
+from ..utils.structure_parser import segmentar_linea
+
+class TreeHighlighter:
+    """
+    Resaltado de la estructura en el editor: conectores, iconos y directorios.
+
+    Solo se resaltan las líneas visibles más un margen. Lo ya resaltado es un rango
+    contiguo delimitado por dos marcas del widget, que Tk desplaza solo al insertar o
+    borrar texto; al desplazarse se resalta lo que falta del rango visible y al
+    editar se vuelven a resaltar únicamente las líneas modificadas.
+    """
+
+    MARGIN = 50  # Líneas resaltadas por encima y por debajo de lo visible
+    TAGS = ('hl_conector', 'hl_icono', 'hl_directorio')
+    START_MARK = 'hl_inicio'
+    END_MARK = 'hl_fin'
+
+    def __init__(self, text_widget):
+        self.text = text_widget
+        self._empty = True   # Todavía no hay nada resaltado
+        self._pending = False
+        self.text.mark_set(self.START_MARK, '1.0')
+        self.text.mark_set(self.END_MARK, '1.0')
+        self.text.mark_gravity(self.START_MARK, tk.LEFT)
+        self.text.mark_gravity(self.END_MARK, tk.RIGHT)
+
+    def configure(self, tag_config):
+        """Aplica los colores de los tags; la selección queda por encima"""
+        for tag, options in tag_config.items():
+            self.text.tag_configure(tag, **options)
+        self.text.tag_raise('sel')
+
+    def reset(self):
+        """Olvida lo resaltado (se reemplazó el contenido) y resalta lo visible"""
+        self._empty = True
+        self.schedule()
+
+    def schedule(self):
+        """Completa el resaltado de lo visible cuando Tk quede libre"""
+        if not self._pending:
+            self._pending = True
+            self.text.after_idle(self._extend)
+
+    def on_edit(self, first, last):
+        """Vuelve a resaltar las líneas first..last del widget, recién modificadas"""
+        if self._empty:
+            self.schedule()
+            return
+        low, high = self._visible_range()
+        if last - first > high - low:
+            # Cambio grande (p. ej. un pegado): basta con lo visible
+            self._empty = True
+        else:
+            self._highlight(max(first, 1), min(last, self._line_count()))
+        self.schedule()
+
+    def _line(self, index) -> int:
+        return int(self.text.index(index).split('.')[0])
+
+    def _line_count(self) -> int:
+        return self._line('end-1c')
+
+    def _visible_range(self):
+        """Líneas visibles más el margen"""
+        first = self._line('@0,0')
+        last = self._line(f'@0,{self.text.winfo_height()}')
+        return max(1, first - self.MARGIN), min(self._line_count(), last + self.MARGIN)
+
+    def _extend(self):
+        """Resalta lo que falta del rango visible"""
+        self._pending = False
+        low, high = self._visible_range()
+        if self._empty:
+            done_low, done_high = high + 2, high + 1  # Nada hecho: no se solapa
+        else:
+            done_low, done_high = self._line(self.START_MARK), self._line(self.END_MARK)
+
+        if high < done_low - 1 or low > done_high + 1:
+            # Sin contacto con lo resaltado: el rango pasa a ser lo visible
+            self._highlight(low, high)
+            done_low, done_high = low, high
+        else:
+            if low < done_low:
+                self._highlight(low, done_low - 1)
+                done_low = low
+            if high > done_high:
+                self._highlight(done_high + 1, high)
+                done_high = high
+
+        self._empty = False
+        self.text.mark_set(self.START_MARK, f'{done_low}.0')
+        self.text.mark_set(self.END_MARK, f'{done_high}.end')
+
+    def _highlight(self, first, last):
+        """Resalta las líneas first..last con una llamada a Tk por tag"""
+        if first > last:
+            return
+        start, end = f'{first}.0', f'{last}.end'
+        for tag in self.TAGS:
+            self.text.tag_remove(tag, start, end)
+
+        ranges = {tag: [] for tag in self.TAGS}
+        for numero, linea in enumerate(self.text.get(start, end).split('\n'), first):
+            partes = segmentar_linea(linea)
+            if partes is None:
+                continue
+            prefijo, icono, nombre = partes
+            if prefijo.strip():
+                ranges['hl_conector'] += (f'{numero}.0', f'{numero}.{len(prefijo)}')
+            # Desde el icono se cuenta desde el final de la línea: Tk puede contar un
+            # emoji como dos caracteres y el prefijo nunca los tiene
+            final = len(linea) - len(linea.rstrip())
+            nombre_inicio = f'{numero}.end-{final + len(nombre)}c'
+            if icono:
+                ranges['hl_icono'] += (f'{numero}.{len(prefijo)}', nombre_inicio)
+            if nombre.endswith('/'):
+                ranges['hl_directorio'] += (nombre_inicio, f'{numero}.end-{final}c')
+
+        for tag, indices in ranges.items():
+            if indices:
+                self.text.tag_add(tag, *indices)
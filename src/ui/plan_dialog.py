@@ -0,0 +1,86 @@
+import tkinter as tk
+from tkinter import ttk
+from itertools import islice
+
+class PlanDialog:
+    """Vista previa de lo que hará "Crear Estructura" en el destino elegido"""
+
+    MAX_LINEAS = 5000  # Líneas del detalle; el resto solo se cuenta en el resumen
+
+    def __init__(self, parent, styles, plan, lineas, apply_callback):
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("Plan de creación")
+        self.dialog.geometry("700x500")
+
+        self.styles = styles
+        self.plan = plan
+        self.apply_callback = apply_callback
+
+        # Hacer la ventana modal
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+
+        self.setup_ui(lineas)
+
+    def setup_ui(self, lineas):
+        """Configura la interfaz del diálogo"""
+        main_frame = ttk.Frame(self.dialog, padding="20")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        ttk.Label(
+            main_frame,
+            text=f"Destino: {self.plan.base_path}",
+            font=('Segoe UI', 10, 'bold')
+        ).pack(anchor=tk.W, pady=(0, 5))
+
+        ttk.Label(
+            main_frame,
+            text=self.plan.resumen(),
+            wraplength=640
+        ).pack(anchor=tk.W, pady=(0, 5))
+
+        ttk.Label(
+            main_frame,
+            text="+ se creará    = ya existe    ! conflicto de tipo (impide aplicar)"
+        ).pack(anchor=tk.W, pady=(0, 10))
+
+        # Detalle del plan
+        text_frame = ttk.Frame(main_frame)
+        text_frame.pack(fill=tk.BOTH, expand=True)
+
+        detalle = tk.Text(text_frame, height=15, **self.styles.get_text_widget_config())
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=detalle.yview)
+        detalle.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        detalle.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        mostradas = list(islice(lineas, self.MAX_LINEAS))
+        detalle.insert("1.0", "\n".join(mostradas))
+        restantes = len(self.plan.estados) - len(mostradas)
+        if restantes > 0:
+            detalle.insert(tk.END, f"\n… y {restantes:,} entradas más")
+        detalle.configure(state=tk.DISABLED)
+
+        # Botones
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill=tk.X, pady=(20, 0))
+
+        aplicar = ttk.Button(
+            button_frame,
+            text="Aplicar",
+            command=self._apply
+        )
+        aplicar.pack(side=tk.RIGHT, padx=5)
+        if self.plan.conflictos or self.plan.vacio:
+            aplicar.configure(state=tk.DISABLED)
+
+        ttk.Button(
+            button_frame,
+            text="Cancelar",
+            command=self.dialog.destroy
+        ).pack(side=tk.RIGHT, padx=5)
+
+    def _apply(self):
+        """Cierra el diálogo y aplica el plan"""
+        self.dialog.destroy()
+        self.apply_callback(self.plan)
@@ -6,7 +6,7 @@ class PreferencesDialog:
     def __init__(self, parent, settings, styles, apply_callback):
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Preferencias")
-        self.dialog.geometry("400x500")
+        self.dialog.geometry("400x700")
         self.dialog.resizable(False, False)
         
         self.settings = settings
@@ -23,6 +23,10 @@ class PreferencesDialog:
         self.font_size_var = tk.StringVar(value=str(settings.get('font_size')))
         self.ui_font_family_var = tk.StringVar(value=settings.get('ui_font_family'))
         self.ui_font_size_var = tk.StringVar(value=str(settings.get('ui_font_size')))
+        self.scan_workers_var = tk.StringVar(value=str(settings.get('scan_workers')))
+        self.seguir_enlaces_var = tk.BooleanVar(value=settings.get('seguir_enlaces'))
+        self.exclusiones_var = tk.StringVar(value=', '.join(settings.get('exclusiones')))
+        self.usar_gitignore_var = tk.BooleanVar(value=settings.get('usar_gitignore'))
         
         self.setup_ui()
         
@@ -131,6 +135,51 @@ class PreferencesDialog:
         )
         ui_size_combo.pack(side=tk.LEFT)
         
+        # Sección de Escaneo
+        self._create_section_label(main_frame, "Escaneo")
+        
+        scan_workers_frame = ttk.Frame(main_frame)
+        scan_workers_frame.pack(fill=tk.X, pady=5)
+        
+        ttk.Label(
+            scan_workers_frame,
+            text="Hilos de lectura:"
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        workers_combo = ttk.Combobox(
+            scan_workers_frame,
+            textvariable=self.scan_workers_var,
+            values=[str(i) for i in (1, 2, 4, 8, 16, 32)],
+            state="readonly",
+            width=5
+        )
+        workers_combo.pack(side=tk.LEFT)
+        
+        ttk.Checkbutton(
+            main_frame,
+            text="Seguir enlaces simbólicos (omite ciclos)",
+            variable=self.seguir_enlaces_var
+        ).pack(anchor=tk.W, pady=(0, 5))
+        
+        ttk.Checkbutton(
+            main_frame,
+            text="Respetar archivos .gitignore",
+            variable=self.usar_gitignore_var
+        ).pack(anchor=tk.W, pady=(0, 5))
+        
+        exclusiones_frame = ttk.Frame(main_frame)
+        exclusiones_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        ttk.Label(
+            exclusiones_frame,
+            text="Excluir:"
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Entry(
+            exclusiones_frame,
+            textvariable=self.exclusiones_var
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
         # Botones
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=(20, 0))
@@ -163,6 +212,12 @@ class PreferencesDialog:
         self.settings.set('font_size', int(self.font_size_var.get()))
         self.settings.set('ui_font_family', self.ui_font_family_var.get())
         self.settings.set('ui_font_size', int(self.ui_font_size_var.get()))
+        self.settings.set('scan_workers', int(self.scan_workers_var.get()))
+        self.settings.set('seguir_enlaces', self.seguir_enlaces_var.get())
+        self.settings.set('usar_gitignore', self.usar_gitignore_var.get())
+        self.settings.set('exclusiones', [
+            patron.strip() for patron in self.exclusiones_var.get().split(',') if patron.strip()
+        ])
         
         # Guardar y aplicar cambios
         self.settings.save_settings()
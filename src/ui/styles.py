@@ -13,6 +13,7 @@ class Styles:
             'preview_bg': '#2d2d2d',
             'preview_fg': '#e0e0e0',
             'title_fg': '#00a5ff',
+            'connector_fg': '#7a7a7a',
             'error_color': '#ff6b6b',
             'success_color': '#4cd964',
             'warning_color': '#ffcd38'
@@ -30,6 +31,7 @@ class Styles:
             'preview_bg': '#ffffff',
             'preview_fg': '#000000',
             'title_fg': '#0066cc',
+            'connector_fg': '#a0a0a0',
             'error_color': '#dc3545',
             'success_color': '#28a745',
             'warning_color': '#ffc107'
@@ -160,6 +162,22 @@ class Styles:
             'pady': 10
         }
         
+    def get_error_tag_config(self):
+        """Retorna la configuración del tag que marca líneas con errores en el editor"""
+        return {
+            'foreground': self.current_theme['error_color'],
+            'underline': True
+        }
+
+    def get_highlight_tag_config(self):
+        """Retorna la configuración de los tags del resaltado del editor"""
+        theme_colors = self.current_theme
+        return {
+            'hl_conector': {'foreground': theme_colors['connector_fg']},
+            'hl_icono': {'foreground': theme_colors['warning_color']},
+            'hl_directorio': {'foreground': theme_colors['title_fg']}
+        }
+
     def update_theme(self, theme_name):
         """Actualiza el tema actual"""
         self.current_theme = self.THEMES[theme_name]
@@ -0,0 +1,205 @@
+import logging
+import tkinter as tk
+from tkinter import ttk
+
+from ..utils.scanner import listar_subdirectorio
+
+logger = logging.getLogger('ConvertidorDirectorios')
+
+class TreeExplorer:
+    """
+    Explorador de un directorio con ttk.Treeview.
+
+    Cada directorio se lista con las mismas reglas que el escaneo completo
+    (exclusiones y .gitignore) la primera vez que se expande; hasta entonces tiene
+    un hijo ficticio para que se pueda abrir. Mostrar la raíz de un árbol enorme
+    solo lee la raíz. Lo expandido, o solo lo marcado si hay marcas, se puede
+    exportar al editor.
+    """
+
+    PLACEHOLDER = '…'
+    CHECKED = '☑'
+    UNCHECKED = '☐'
+
+    def __init__(self, parent, callbacks):
+        self.callbacks = callbacks
+        self.dir_raiz = None
+        self.exclusiones = None
+        self.seguir_enlaces = False
+        self._entradas = {}        # iid -> (ruta relativa, Entrada del escáner)
+        self._pendientes = set()   # Directorios que todavía no se listaron
+        self._marcados = set()
+
+        self.frame = ttk.Frame(parent, style='TFrame')
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Configura el panel del explorador"""
+        header = ttk.Frame(self.frame, style='TFrame')
+        header.pack(fill=tk.X, pady=(0, 5))
+
+        self.title_label = ttk.Label(header, text="🌳 Explorador", style='Custom.TLabel')
+        self.title_label.pack(side=tk.LEFT)
+
+        ttk.Button(
+            header,
+            text="✖",
+            width=3,
+            command=self.callbacks['cerrar']
+        ).pack(side=tk.RIGHT)
+
+        tree_frame = ttk.Frame(self.frame, style='TFrame')
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.tree = ttk.Treeview(tree_frame, columns=('marca',), selectmode='browse')
+        self.tree.heading('#0', text='Nombre', anchor=tk.W)
+        self.tree.heading('marca', text='✓')
+        self.tree.column('marca', width=30, minwidth=30, stretch=False, anchor=tk.CENTER)
+
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind('<<TreeviewOpen>>', self._on_open)
+        self.tree.bind('<Button-1>', self._on_click)
+        self.tree.bind('<space>', self._on_space)
+
+        ttk.Label(
+            self.frame,
+            text="Marca (☐) para exportar solo esas entradas",
+            style='Custom.TLabel'
+        ).pack(anchor=tk.W, pady=(5, 0))
+
+        button_frame = ttk.Frame(self.frame, style='TFrame')
+        button_frame.pack(fill=tk.X, pady=(5, 0))
+
+        ttk.Button(
+            button_frame,
+            text="📤 Exportar al editor",
+            style='Custom.TButton',
+            command=self._export
+        ).pack(side=tk.LEFT)
+
+        ttk.Button(
+            button_frame,
+            text="Desmarcar",
+            command=self.clear_marks
+        ).pack(side=tk.LEFT, padx=5)
+
+    def cargar(self, dir_raiz, exclusiones, seguir_enlaces=False):
+        """Muestra el contenido de dir_raiz; sus subdirectorios se listan al expandirlos"""
+        self.tree.delete(*self.tree.get_children())
+        self._entradas.clear()
+        self._pendientes.clear()
+        self._marcados.clear()
+        self.dir_raiz = dir_raiz
+        self.exclusiones = exclusiones
+        self.seguir_enlaces = seguir_enlaces
+        self.title_label.configure(text=f"🌳 {dir_raiz}")
+        self._listar('', '')
+
+    def _listar(self, iid, rel_dir):
+        """Agrega al item los hijos del directorio rel_dir"""
+        try:
+            entradas, _ = listar_subdirectorio(self.dir_raiz, rel_dir, self.exclusiones)
+        except OSError as e:
+            logger.warning("No se pudo listar %s: %s", rel_dir or self.dir_raiz, e)
+            return
+
+        for entrada in entradas:
+            texto = f"📁 {entrada.nombre}" if entrada.es_directorio else entrada.nombre
+            hijo = self.tree.insert(iid, tk.END, text=texto, values=(self.UNCHECKED,))
+            rel_hijo = f"{rel_dir}/{entrada.nombre}" if rel_dir else entrada.nombre
+            self._entradas[hijo] = (rel_hijo, entrada)
+            # Los enlaces solo se abren si se siguen; expandir a mano no puede entrar en un ciclo sin fin
+            if entrada.es_directorio and (self.seguir_enlaces or not entrada.es_enlace):
+                self.tree.insert(hijo, tk.END, text=self.PLACEHOLDER)
+                self._pendientes.add(hijo)
+
+    def _on_open(self, event):
+        """Lista el directorio la primera vez que se expande"""
+        iid = self.tree.focus()
+        if iid not in self._pendientes:
+            return
+        self._pendientes.discard(iid)
+        self.tree.delete(*self.tree.get_children(iid))
+        self._listar(iid, self._entradas[iid][0])
+
+    def _on_click(self, event):
+        """Un clic en la columna de marca alterna la marca del item"""
+        if self.tree.identify_column(event.x) != '#1':
+            return
+        iid = self.tree.identify_row(event.y)
+        if iid in self._entradas:
+            self._toggle(iid)
+            return "break"
+
+    def _on_space(self, event):
+        """La barra espaciadora alterna la marca del item seleccionado"""
+        iid = self.tree.focus()
+        if iid in self._entradas:
+            self._toggle(iid)
+        return "break"
+
+    def _toggle(self, iid):
+        """Marca o desmarca un item"""
+        if iid in self._marcados:
+            self._marcados.discard(iid)
+            self.tree.set(iid, 'marca', self.UNCHECKED)
+        else:
+            self._marcados.add(iid)
+            self.tree.set(iid, 'marca', self.CHECKED)
+
+    def clear_marks(self):
+        """Quita todas las marcas"""
+        for iid in self._marcados:
+            if self.tree.exists(iid):
+                self.tree.set(iid, 'marca', self.UNCHECKED)
+        self._marcados.clear()
+
+    def recorrer(self):
+        """
+        Recorre en preorden lo que se ve en el explorador (los hijos de los
+        directorios expandidos) como (nivel, entrada, es_ultimo), el formato del
+        escáner. Si hay marcas, solo entran las entradas marcadas, lo ya listado
+        debajo de ellas y sus ancestros, estén expandidos o no.
+        """
+        con_marca_debajo = set()
+        for iid in self._marcados:
+            padre = self.tree.parent(iid)
+            while padre and padre not in con_marca_debajo:
+                con_marca_debajo.add(padre)
+                padre = self.tree.parent(padre)
+
+        def incluidos(padre, bajo_marca):
+            hijos = []
+            for iid in self.tree.get_children(padre):
+                if iid not in self._entradas:
+                    continue
+                marcado = bajo_marca or iid in self._marcados
+                if not self._marcados or marcado or iid in con_marca_debajo:
+                    hijos.append((iid, marcado))
+            return hijos
+
+        pila = [[incluidos('', False), 0]]
+        while pila:
+            marco = pila[-1]
+            hijos, indice = marco
+            if indice >= len(hijos):
+                pila.pop()
+                continue
+            marco[1] = indice + 1
+            iid, marcado = hijos[indice]
+            yield len(pila) - 1, self._entradas[iid][1], indice == len(hijos) - 1
+            if iid in self._pendientes:
+                continue
+            # Con marcas se recorre todo lo listado: una marca dentro de un padre colapsado también se exporta
+            if self._marcados or self.tree.getboolean(self.tree.item(iid, 'open')):
+                pila.append([incluidos(iid, marcado), 0])
+
+    def _export(self):
+        """Envía lo expandido (o lo marcado) al editor"""
+        if self.dir_raiz is None:
+            return
+        self.callbacks['exportar'](self.dir_raiz, self.recorrer())
@@ -0,0 +1,192 @@
+import tkinter as tk
+
+class VirtualPreview:
+    """
+    Vista virtualizada del editor para documentos grandes.
+
+    Mientras está activa, el documento completo vive en `lines` y el widget Text solo
+    contiene una ventana de WINDOW líneas alrededor de lo visible. La barra de
+    desplazamiento representa la posición en el documento completo; al acercarse al
+    borde de la ventana (o al arrastrar la barra) se carga otra ventana. Las
+    ediciones hechas en la ventana se vuelcan al documento antes de cada cambio de
+    ventana, así que el editor sigue siendo editable (el deshacer se limita a la
+    ventana actual).
+    """
+
+    WINDOW = 3000  # Líneas cargadas en el widget
+    MARGIN = 500   # Al quedar menos líneas que esto por encima o por debajo, se recentra
+
+    def __init__(self, text_widget, y_scrollbar):
+        self.text = text_widget
+        self.scrollbar = y_scrollbar
+        self.lines = []
+        self.active = False
+        self.start = 0    # Índice en `lines` de la primera línea del widget
+        self.loaded = 0   # Cantidad de líneas de `lines` cargadas en el widget
+        self._edited = False
+        self._recenter_pending = False
+        self.on_load = None    # Se llama tras cargar una ventana (p. ej. para volver a marcar errores)
+        self.on_scroll = None  # Se llama cuando cambia lo visible dentro de la ventana
+        self._normal_yscroll = None
+
+    def activate(self, lines):
+        """Pasa a modo virtual con el documento `lines` y muestra su inicio"""
+        self.lines = lines if isinstance(lines, list) else list(lines)
+        self._edited = False
+        if not self.active:
+            self.active = True
+            self._normal_yscroll = self.text.cget('yscrollcommand')
+            self.text.configure(yscrollcommand=self._on_text_yview)
+            self.scrollbar.configure(command=self._on_scrollbar)
+        # El contenido previo del widget ya está en `lines` (o se descarta): no es una edición
+        self.text.edit_modified(False)
+        self.start = self.loaded = 0
+        self._load(0, 0)
+
+    def deactivate(self):
+        """Vuelve al widget normal (el contenido del widget no se modifica)"""
+        if not self.active:
+            return
+        self.active = False
+        self.lines = []
+        self.start = self.loaded = 0
+        self.text.configure(yscrollcommand=self._normal_yscroll or self.scrollbar.set)
+        self.scrollbar.configure(command=self.text.yview)
+
+    def content(self) -> str:
+        """Documento completo, incluidas las ediciones de la ventana actual"""
+        self._sync()
+        return "\n".join(self.lines)
+
+    def document_lines(self) -> list:
+        """Copia de las líneas del documento, incluidas las ediciones de la ventana actual"""
+        self._sync()
+        return list(self.lines)
+
+    def iter_lines(self):
+        """Recorre las líneas del documento sin copiarlas; no se debe editar mientras tanto"""
+        self._sync()
+        return iter(self.lines)
+
+    def line_count(self) -> int:
+        """Cantidad de líneas del documento"""
+        self._sync()
+        return len(self.lines)
+
+    @property
+    def edited(self) -> bool:
+        """Indica si el usuario editó el documento desde la última llamada a mark_clean"""
+        self._sync()
+        return self._edited
+
+    def mark_clean(self):
+        """Marca el documento como no editado (tras una actualización programática)"""
+        self._sync()
+        self._edited = False
+
+    def append(self, lines):
+        """Agrega líneas al final del documento sin tocar la ventana visible"""
+        self._sync()
+        window_open = self.start + self.loaded == len(self.lines) and self.loaded < self.WINDOW
+        self.lines.extend(lines)
+        if window_open:
+            # La ventana todavía no estaba completa: completarla con lo nuevo
+            self._load(self.start, self._top_line())
+        else:
+            self._update_scrollbar()
+
+    def replace(self, start, count, lines):
+        """Reemplaza `count` líneas del documento desde `start` (base 0) y refresca la ventana"""
+        self._sync()
+        self.lines[start:start + count] = lines
+        self._load(self.start, self._top_line())
+
+    def _sync(self):
+        """Vuelca al documento las ediciones hechas en la ventana"""
+        if not self.active or not self.text.edit_modified():
+            return
+        window = self.text.get("1.0", "end-1c").split("\n")
+        self.lines[self.start:self.start + self.loaded] = window
+        self.loaded = len(window)
+        self._edited = True
+        self.text.edit_modified(False)
+
+    def _top_line(self) -> int:
+        """Línea del documento que se ve arriba del todo"""
+        first = self.text.yview()[0]
+        return self.start + int(first * self.loaded)
+
+    def _load(self, start, top_line):
+        """Carga la ventana que empieza en `start` y deja `top_line` arriba"""
+        self._sync()
+        total = len(self.lines)
+        start = max(0, min(start, total - self.WINDOW))
+        insert_line = self.start + int(self.text.index(tk.INSERT).split('.')[0]) - 1
+
+        self.start = start
+        window = self.lines[start:start + self.WINDOW]
+        self.loaded = len(window)
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", "\n".join(window))
+        self.text.edit_modified(False)
+        self.text.edit_reset()
+
+        if start <= insert_line < start + self.loaded:
+            self.text.mark_set(tk.INSERT, f"{insert_line - start + 1}.0")
+        if self.loaded:
+            self.text.yview_moveto((top_line - start) / self.loaded)
+        self._update_scrollbar()
+        if self.on_load:
+            self.on_load()
+
+    def _update_scrollbar(self):
+        """Muestra en la barra la posición de la ventana visible dentro del documento"""
+        total = len(self.lines)
+        if not total or not self.loaded:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        first, last = self.text.yview()
+        self.scrollbar.set(
+            (self.start + first * self.loaded) / total,
+            (self.start + last * self.loaded) / total
+        )
+
+    def _near_edge(self) -> bool:
+        """Lo visible está a menos de MARGIN líneas de un borde de la ventana con más documento detrás"""
+        first, last = self.text.yview()
+        near_top = self.start > 0 and first * self.loaded < self.MARGIN
+        near_bottom = (self.start + self.loaded < len(self.lines)
+                       and self.loaded - last * self.loaded < self.MARGIN)
+        return near_top or near_bottom
+
+    def _on_text_yview(self, first, last):
+        """yscrollcommand del widget: actualiza la barra y recentra cerca de los bordes"""
+        self._update_scrollbar()
+        if self.on_scroll:
+            self.on_scroll()
+        if not self._recenter_pending and self._near_edge():
+            self._recenter_pending = True
+            self.text.after_idle(self._recenter)
+
+    def _recenter(self):
+        """Carga una ventana centrada en lo que se está viendo"""
+        self._recenter_pending = False
+        # Tk puede avisar con valores intermedios mientras se carga una ventana
+        if not self.active or not self._near_edge():
+            return
+        top_line = self._top_line()
+        self._load(top_line - self.WINDOW // 2, top_line)
+
+    def _on_scrollbar(self, *args):
+        """command de la barra: 'moveto' se interpreta sobre el documento completo"""
+        if args[0] != 'moveto':
+            self.text.yview(*args)
+            return
+        total = len(self.lines)
+        target = int(float(args[1]) * total)
+        target = max(0, min(target, total - 1))
+        if self.start + self.MARGIN <= target < self.start + self.loaded - self.MARGIN or (
+                self.loaded == total):
+            self.text.yview_moveto((target - self.start) / max(self.loaded, 1))
+        else:
+            self._load(target - self.WINDOW // 2, target)
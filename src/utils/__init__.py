@@ -3,6 +3,13 @@ Utilidades para el Convertidor de Estructuras
 """
 
 from .file_handler import FileHandler
-from .logger import setup_logger
 
 __all__ = ['FileHandler', 'setup_logger']
+
+
+def __getattr__(nombre):
+    # El logger de la aplicación depende de colorama; la línea de comandos no lo usa
+    if nombre == 'setup_logger':
+        from .logger import setup_logger
+        return setup_logger
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
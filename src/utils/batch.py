@@ -0,0 +1,144 @@
+"""
+Conversión por lotes: muchos directorios a archivos de estructura en paralelo
+"""
+
+import glob
+import locale
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .exclusion import Exclusiones
+from .renderers import FORMATOS, exportar
+from .scanner import recorrer_paralelo
+
+logger = logging.getLogger('ConvertidorDirectorios')
+
+
+def expandir_raices(patrones):
+    """
+    Directorios indicados por una lista de rutas o patrones glob, sin repetir y
+    en el orden dado (cada patrón se expande en orden alfabético). Devuelve
+    (raices, omitidas): omitidas son las rutas explícitas que no son directorios.
+    """
+    raices = []
+    omitidas = []
+    vistas = set()
+    for patron in patrones:
+        rutas = sorted(glob.glob(patron)) if glob.has_magic(patron) else [patron]
+        for ruta in rutas:
+            clave = os.path.realpath(ruta)
+            if clave in vistas:
+                continue
+            if not os.path.isdir(ruta):
+                if not glob.has_magic(patron):
+                    logger.warning("Se omite %s: no es un directorio", ruta)
+                    omitidas.append(ruta)
+                continue
+            vistas.add(clave)
+            raices.append(ruta)
+    return raices, omitidas
+
+
+def archivos_salida(raices, directorio_salida: str, extension_salida: str = '.md') -> list:
+    """Un archivo por raíz con el nombre del directorio; los nombres repetidos llevan sufijo"""
+    archivos = []
+    usados = set()
+    for raiz in raices:
+        base = os.path.basename(os.path.normpath(os.path.abspath(raiz))) or 'raiz'
+        nombre = base
+        n = 2
+        while nombre.lower() in usados:
+            nombre = f"{base}_{n}"
+            n += 1
+        usados.add(nombre.lower())
+        archivos.append(os.path.join(directorio_salida, nombre + extension_salida))
+    return archivos
+
+
+def _iniciar_proceso(nivel_registro, orden_regional):
+    """Los procesos hijos registran y ordenan como este (con spawn no lo heredan)"""
+    logger.setLevel(nivel_registro)
+    try:
+        locale.setlocale(locale.LC_COLLATE, orden_regional)
+    except locale.Error:
+        pass
+
+
+def _convertir(raiz, archivo, formato, exclude_patterns, usar_gitignore, workers, seguir_enlaces):
+    """Escanea una raíz y guarda su estructura; se ejecuta en un proceso del pool"""
+    inicio = time.perf_counter()
+    entradas = 0
+
+    def contar(recorrido):
+        nonlocal entradas
+        for item in recorrido:
+            entradas += 1
+            yield item
+
+    try:
+        exclusiones = Exclusiones(exclude_patterns, usar_gitignore=usar_gitignore)
+        recorrido = recorrer_paralelo(raiz, exclusiones, workers, seguir_enlaces,
+                                      orden=FORMATOS[formato].orden, todas=FORMATOS[formato].muestra_todo)
+        exportar(archivo, formato, contar(recorrido), raiz)
+        error = None
+    except Exception as e:
+        logger.error("Error convirtiendo %s: %s", raiz, e)
+        error = str(e)
+
+    return {
+        'raiz': raiz,
+        'archivo': archivo,
+        'entradas': entradas,
+        'segundos': time.perf_counter() - inicio,
+        'error': error,
+    }
+
+
+def convertir_lote(raices, directorio_salida: str, formato: str = 'arbol', comprimir: str = None,
+                   exclude_patterns=None, usar_gitignore: bool = True, procesos: int = None,
+                   workers: int = 1, seguir_enlaces: bool = False):
+    """
+    Escanea cada raíz y escribe su estructura en directorio_salida en uno de los
+    formatos registrados (ver renderers); arbol e iconos llevan el encabezado de
+    FileHandler.guardar_estructura. Con comprimir ('gz', 'xz' o 'zst') los archivos
+    se comprimen al vuelo. Las raíces se reparten entre
+    `procesos` procesos (por defecto uno por núcleo), así el escaneo y el
+    renderizado de cada una no compiten por el GIL; dentro de cada proceso
+    `workers` hilos listan directorios en paralelo.
+
+    Genera un dict {'raiz', 'archivo', 'entradas', 'segundos', 'error'} por raíz a
+    medida que terminan. Un error en una raíz queda en su resultado y no detiene
+    el resto.
+    """
+    raices = list(raices)
+    if not raices:
+        return
+    os.makedirs(directorio_salida, exist_ok=True)
+    extension_salida = FORMATOS[formato].extension + (f'.{comprimir}' if comprimir else '')
+    tareas = [
+        (raiz, archivo, formato, exclude_patterns, usar_gitignore, workers, seguir_enlaces)
+        for raiz, archivo in zip(raices, archivos_salida(raices, directorio_salida, extension_salida))
+    ]
+    procesos = min(procesos or os.cpu_count() or 1, len(tareas))
+    logger.info("Convirtiendo %d directorios con %d procesos", len(tareas), procesos)
+
+    if procesos <= 1:
+        # Sin pool: evita arrancar un proceso para una sola raíz
+        for tarea in tareas:
+            yield _convertir(*tarea)
+        return
+
+    pool = ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso,
+                               initargs=(logger.getEffectiveLevel(), locale.setlocale(locale.LC_COLLATE)))
+    futuros = []
+    try:
+        futuros = [pool.submit(_convertir, *tarea) for tarea in tareas]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+    finally:
+        # Si se interrumpe el lote no se empiezan las raíces pendientes
+        for futuro in futuros:
+            futuro.cancel()
+        pool.shutdown(wait=True)
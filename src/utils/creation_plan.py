@@ -0,0 +1,120 @@
+"""
+Plan de creación de una estructura comparada con lo que ya existe en el destino
+"""
+
+import os
+
+CREAR = '+'
+EXISTE = '='
+CONFLICTO = '!'
+
+
+def _listar_destino(ruta: str) -> dict:
+    """Contenido actual de un directorio del destino: {nombre: es_directorio}"""
+    with os.scandir(ruta) as it:
+        return {entry.name: entry.is_dir() for entry in it}
+
+
+class PlanCreacion:
+    """
+    Qué haría crear una estructura en base_path, sin tocar el disco:
+
+        niveles[n]   directorios a crear de profundidad n (sus padres existen o se crean antes)
+        archivos     archivos a crear
+        existentes   cantidad de entradas que ya están con el tipo correcto
+        conflictos   [(ruta, mensaje)] entradas que no se pueden crear
+        estados      CREAR, EXISTE o CONFLICTO para cada entrada, en orden de documento
+
+    Cada directorio existente se lista una sola vez (un scandir) y solo si la
+    estructura tiene entradas dentro de él; bajo un directorio que hay que crear
+    no se consulta el disco.
+    """
+
+    def __init__(self, base_path: str):
+        self.base_path = os.fspath(base_path)
+        self.niveles = []
+        self.archivos = []
+        self.existentes = 0
+        self.conflictos = []
+        self.estados = []
+
+    @classmethod
+    def desde_estructura(cls, estructura, base_path: str) -> 'PlanCreacion':
+        """Compara una EstructuraAnalizada con el contenido de base_path"""
+        plan = cls(base_path)
+        base_existe = os.path.isdir(plan.base_path)
+        # Por profundidad n: ruta del directorio que recibe las entradas, su estado en
+        # disco (True existe, False hay que crearlo, None bloqueado por un conflicto)
+        # y su listado, que se lee la primera vez que se necesita
+        rutas = [plan.base_path]
+        en_disco = [True if base_existe else False]
+        listados = [None]
+
+        for profundidad, entrada, _ in estructura.recorrer():
+            padre = rutas[profundidad]
+            ruta = os.path.join(padre, entrada.nombre)
+            estado_padre = en_disco[profundidad]
+
+            if estado_padre is None:
+                estado = CONFLICTO
+                plan.conflictos.append((ruta, "Está dentro de una ruta en conflicto"))
+            else:
+                encontrado = None
+                if estado_padre:
+                    if listados[profundidad] is None:
+                        listados[profundidad] = _listar_destino(padre)
+                    encontrado = listados[profundidad].get(entrada.nombre)
+                    if encontrado is None and ('/' in entrada.nombre or os.sep in entrada.nombre):
+                        # Nombres con subdirectorios no aparecen en el listado del padre
+                        encontrado = os.path.isdir(ruta) if os.path.lexists(ruta) else None
+
+                if encontrado is None:
+                    estado = CREAR
+                    if entrada.es_directorio:
+                        while len(plan.niveles) <= profundidad:
+                            plan.niveles.append([])
+                        plan.niveles[profundidad].append(ruta)
+                    else:
+                        plan.archivos.append(ruta)
+                elif encontrado == entrada.es_directorio:
+                    estado = EXISTE
+                    plan.existentes += 1
+                else:
+                    estado = CONFLICTO
+                    plan.conflictos.append((
+                        ruta,
+                        "Existe un archivo con ese nombre" if entrada.es_directorio
+                        else "Existe un directorio con ese nombre"
+                    ))
+            plan.estados.append(estado)
+
+            if entrada.es_directorio:
+                del rutas[profundidad + 1:], en_disco[profundidad + 1:], listados[profundidad + 1:]
+                rutas.append(ruta)
+                en_disco.append(True if estado == EXISTE else False if estado == CREAR else None)
+                listados.append(None)
+
+        return plan
+
+    @property
+    def directorios_a_crear(self) -> int:
+        """Cantidad de directorios que faltan en el destino"""
+        return sum(len(directorios) for directorios in self.niveles)
+
+    @property
+    def vacio(self) -> bool:
+        """No hay nada que crear"""
+        return not self.archivos and not any(self.niveles)
+
+    def resumen(self) -> str:
+        """Descripción corta del plan para mostrar al usuario"""
+        texto = (f"Se crearán {self.directorios_a_crear:,} directorios y {len(self.archivos):,} archivos; "
+                 f"{self.existentes:,} entradas ya existen")
+        if self.conflictos:
+            texto += f" y {len(self.conflictos):,} tienen conflictos de tipo"
+        return texto
+
+    def lineas(self, lineas_estructura):
+        """Antepone a cada línea renderizada de la estructura su estado (+, = o !)"""
+        for estado, linea in zip(self.estados, lineas_estructura):
+            yield f"{estado} {linea}"
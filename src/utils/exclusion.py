@@ -0,0 +1,184 @@
+"""
+Reglas de exclusión estilo .gitignore compiladas a expresiones regulares
+"""
+
+import os
+import re
+import logging
+
+logger = logging.getLogger('ConvertidorDirectorios')
+
+EXCLUSIONES_POR_DEFECTO = ['.git', '__pycache__', '.pytest_cache', '.venv', 'node_modules']
+
+
+def _traducir_patron(patron: str) -> str:
+    """Traduce un patrón glob de gitignore a una expresión regular (sin anclas)"""
+    res = []
+    i, n = 0, len(patron)
+    while i < n:
+        c = patron[i]
+        if c == '*':
+            if patron.startswith('**', i):
+                i += 2
+                if i < n and patron[i] == '/':
+                    # '**/' coincide con cero o más directorios completos
+                    res.append('(?:.*/)?')
+                    i += 1
+                else:
+                    res.append('.*')
+                continue
+            res.append('[^/]*')
+        elif c == '?':
+            res.append('[^/]')
+        elif c == '[':
+            fin = patron.find(']', i + 1)
+            contenido = patron[i + 1:fin] if fin != -1 else ''
+            if contenido in ('', '!', '^'):
+                res.append(re.escape(c))
+            else:
+                if contenido[0] in '!^':
+                    contenido = '^' + contenido[1:]
+                res.append('[' + contenido.replace('\\', '\\\\') + ']')
+                i = fin
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            res.append(re.escape(patron[i]))
+        else:
+            res.append(re.escape(c))
+        i += 1
+    return ''.join(res)
+
+
+def _combinar(regexes):
+    """Une varias expresiones en una sola alternativa compilada (o None si no hay)"""
+    if not regexes:
+        return None
+    return re.compile('|'.join(f'(?:{r})' for r in regexes))
+
+
+class ExclusionMatcher:
+    """
+    Reglas compiladas de un archivo .gitignore (o de la lista global de exclusiones).
+
+    Se admiten comentarios (#), negaciones (!), reglas solo para directorios
+    (terminadas en /), reglas ancladas (con / al inicio o en medio, que se comparan
+    con la ruta relativa a `base`) y comodines *, ?, [...] y **. Las reglas sin /
+    se comparan con el nombre de la entrada en cualquier nivel.
+    """
+
+    def __init__(self, patrones=(), base: str = ''):
+        self.base = base
+        self.reglas = []  # (regex, negada, solo_directorios, por_ruta)
+        self.usa_rutas = False
+
+        for patron in patrones:
+            regla = self._compilar_regla(patron)
+            if regla is not None:
+                self.reglas.append(regla)
+                self.usa_rutas = self.usa_rutas or regla[3]
+
+        # Sin negaciones el orden no importa: basta una expresión combinada por tipo
+        self._sin_negaciones = not any(regla[1] for regla in self.reglas)
+        if self._sin_negaciones:
+            self._nombres = _combinar([r.pattern for r, _, d, ruta in self.reglas if not ruta and not d])
+            self._nombres_dir = _combinar([r.pattern for r, _, d, ruta in self.reglas if not ruta and d])
+            self._rutas = _combinar([r.pattern for r, _, d, ruta in self.reglas if ruta and not d])
+            self._rutas_dir = _combinar([r.pattern for r, _, d, ruta in self.reglas if ruta and d])
+
+    @staticmethod
+    def _compilar_regla(patron: str):
+        """Compila una línea de .gitignore; devuelve None para líneas vacías o comentarios"""
+        patron = patron.rstrip('\n\r')
+        if not patron.endswith('\\ '):
+            patron = patron.rstrip()
+        if not patron or patron.startswith('#'):
+            return None
+
+        negada = patron.startswith('!')
+        if negada:
+            patron = patron[1:]
+        elif patron.startswith('\\'):
+            patron = patron[1:]
+
+        solo_directorios = patron.endswith('/')
+        patron = patron.rstrip('/')
+        if not patron:
+            return None
+
+        por_ruta = '/' in patron
+        patron = patron.lstrip('/')
+        return re.compile(_traducir_patron(patron)), negada, solo_directorios, por_ruta
+
+    @classmethod
+    def desde_archivo(cls, ruta_archivo: str, base: str = '') -> 'ExclusionMatcher':
+        """Lee y compila un archivo .gitignore"""
+        try:
+            with open(ruta_archivo, 'r', encoding='utf-8', errors='replace') as f:
+                return cls(f.readlines(), base)
+        except OSError as e:
+            logger.warning("No se pudo leer %s: %s", ruta_archivo, e)
+            return cls((), base)
+
+    def coincide(self, ruta: str, nombre: str, es_directorio: bool):
+        """
+        Evalúa una entrada. `ruta` es relativa a `base`. Devuelve True si se excluye,
+        False si una negación la vuelve a incluir y None si ninguna regla la menciona.
+        """
+        if self._sin_negaciones:
+            if ((self._nombres and self._nombres.fullmatch(nombre))
+                    or (self._rutas and self._rutas.fullmatch(ruta))):
+                return True
+            if es_directorio and ((self._nombres_dir and self._nombres_dir.fullmatch(nombre))
+                                  or (self._rutas_dir and self._rutas_dir.fullmatch(ruta))):
+                return True
+            return None
+
+        # La última regla que coincide es la que decide
+        for regex, negada, solo_directorios, por_ruta in reversed(self.reglas):
+            if solo_directorios and not es_directorio:
+                continue
+            if regex.fullmatch(ruta if por_ruta else nombre):
+                return not negada
+        return None
+
+
+class Exclusiones:
+    """
+    Reglas activas al listar un directorio: las globales más los .gitignore que
+    se encontraron entre la raíz del escaneo y ese directorio. Como en git, un
+    .gitignore más profundo tiene prioridad sobre los de sus ancestros.
+    """
+
+    def __init__(self, patrones=None, usar_gitignore: bool = True):
+        if patrones is None:
+            patrones = EXCLUSIONES_POR_DEFECTO
+        self.usar_gitignore = usar_gitignore
+        self._niveles = (ExclusionMatcher(patrones),)  # Del más externo al más interno
+
+    @classmethod
+    def desde(cls, exclude_patterns) -> 'Exclusiones':
+        """Acepta una lista de patrones, None (valores por defecto) o unas Exclusiones ya creadas"""
+        if isinstance(exclude_patterns, Exclusiones):
+            return exclude_patterns
+        return cls(exclude_patterns)
+
+    def con_gitignore(self, dir_path: str, rel_dir: str) -> 'Exclusiones':
+        """Devuelve unas Exclusiones que además aplican el .gitignore de dir_path"""
+        matcher = ExclusionMatcher.desde_archivo(os.path.join(dir_path, '.gitignore'), rel_dir)
+        if not matcher.reglas:
+            return self
+        nuevas = object.__new__(Exclusiones)
+        nuevas.usar_gitignore = self.usar_gitignore
+        nuevas._niveles = self._niveles + (matcher,)
+        return nuevas
+
+    def excluido(self, ruta: str, nombre: str, es_directorio: bool) -> bool:
+        """Indica si una entrada (ruta relativa a la raíz del escaneo) debe omitirse"""
+        for matcher in reversed(self._niveles):
+            ruta_local = ruta
+            if matcher.usa_rutas and matcher.base:
+                ruta_local = ruta[len(matcher.base) + 1:]
+            resultado = matcher.coincide(ruta_local, nombre, es_directorio)
+            if resultado is not None:
+                return resultado
+        return False
@@ -1,201 +1,199 @@
 from pathlib import Path
-import re
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sys
+import time
 from datetime import datetime
+import gzip
+import lzma
 import logging
 
+from .scanner import recorrer, recorrer_paralelo, listar_subdirectorio, extension
+from .structure_parser import analizar_estructura
+from .creation_plan import PlanCreacion
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
 logger = logging.getLogger('ConvertidorDirectorios')
 
 class FileHandler:
+    BUFFER_ESCRITURA = 1 << 20  # Bytes acumulados antes de cada escritura al disco
+
     @staticmethod
-    def _normalize_directory_structure(estructura: str) -> str:
-        """Normaliza una estructura de directorios a un formato válido"""
+    def _normalize_directory_structure(estructura) -> str:
+        """
+        Normaliza una estructura de directorios a un formato válido.
+        Acepta el texto o una EstructuraAnalizada ya obtenida con analizar_estructura.
+        """
         try:
-            # Dividir en líneas y eliminar líneas vacías
-            lines = [line.rstrip() for line in estructura.split('\n') if line.strip()]
-            normalized_lines = []
-            
-            # Detectar el patrón de indentación usado
-            indent_pattern = None
-            for line in lines[1:]:  # Empezar desde la segunda línea
-                spaces = len(line) - len(line.lstrip())
-                if spaces > 0:
-                    indent_pattern = spaces
-                    break
-            
-            if not indent_pattern:
-                indent_pattern = 2  # Valor por defecto si no se detecta
-                
-            # Procesar cada línea
-            for i, line in enumerate(lines):
-                # Calcular nivel actual
-                spaces_before = len(line) - len(line.lstrip())
-                current_level = spaces_before // indent_pattern if indent_pattern else 0
-                
-                # Limpiar la línea de símbolos existentes
-                clean_line = line.lstrip()
-                for symbol in ['├──', '└──', '│', '─', '├─', '└─', '|']:
-                    clean_line = clean_line.replace(symbol, '')
-                clean_line = clean_line.strip()
-                
-                # Determinar si es el último elemento en su nivel
-                is_last = True
-                for next_line in lines[i + 1:]:
-                    next_spaces = len(next_line) - len(next_line.lstrip())
-                    next_level = next_spaces // indent_pattern if indent_pattern else 0
-                    if next_level <= current_level:
-                        is_last = next_level < current_level
-                        break
-                
-                # Construir la nueva línea
-                new_line = ''
-                
-                # Agregar los conectores verticales para niveles anteriores
-                for level in range(current_level):
-                    # Verificar si hay más elementos en este nivel
-                    has_more = False
-                    for next_line in lines[i + 1:]:
-                        next_spaces = len(next_line) - len(next_line.lstrip())
-                        next_level = next_spaces // indent_pattern if indent_pattern else 0
-                        if next_level > level:
-                            has_more = True
-                            break
-                        elif next_level <= level:
-                            break
-                    new_line += '│   ' if has_more else '    '
-                
-                # Agregar el conector apropiado para el nivel actual
-                new_line += '└── ' if is_last else '├── '
-                new_line += clean_line
-                
-                normalized_lines.append(new_line)
-            
-            return '\n'.join(normalized_lines)
+            if isinstance(estructura, str):
+                estructura = analizar_estructura(estructura)
+            return '\n'.join(FileHandler._lineas_arbol(estructura.recorrer()))
             
         except Exception as e:
-            logger.error(f"Error normalizando estructura: {str(e)}")
+            logger.error("Error normalizando estructura: %s", e)
             raise
 
+    @staticmethod
+    def _lineas_iconos(recorrido, level: int = 0):
+        """Convierte un recorrido (nivel, entrada, es_ultimo) en líneas con iconos"""
+        for nivel, entrada, _ in recorrido:
+            indent = "  " * (level + nivel)
+            if entrada.es_directorio:
+                yield f"{indent}📁 {entrada.nombre}/"
+            else:
+                icon = FileHandler._get_file_icon(extension(entrada.nombre))
+                yield f"{indent}{icon} {entrada.nombre}"
+
+    @staticmethod
+    def _lineas_arbol(recorrido, prefix=""):
+        """Convierte un recorrido (nivel, entrada, es_ultimo) en líneas estilo árbol"""
+        # prefijos[n] es el prefijo acumulado de las entradas del nivel n
+        prefijos = [prefix]
+        for nivel, entrada, is_last in recorrido:
+            current_prefix = prefijos[nivel] + ("└── " if is_last else "├── ")
+
+            if entrada.es_directorio:
+                yield f"{current_prefix}{entrada.nombre}/"
+                del prefijos[nivel + 1:]
+                prefijos.append(prefijos[nivel] + ("    " if is_last else "│   "))
+            else:
+                yield f"{current_prefix}{entrada.nombre}"
+
+    @staticmethod
+    def lineas_recorrido(recorrido, usar_iconos: bool):
+        """Renderiza un recorrido línea a línea en el modo indicado"""
+        if usar_iconos:
+            return FileHandler._lineas_iconos(recorrido)
+        return FileHandler._lineas_arbol(recorrido)
+
+    @staticmethod
+    def iter_estructura(dir_path: str, usar_iconos: bool, exclude_patterns=None, workers: int = 1,
+                        seguir_enlaces: bool = False, cache=None):
+        """
+        Genera perezosamente las líneas de la estructura de un directorio.
+        Cada línea se produce en cuanto se lee su directorio, sin armar el documento.
+        """
+        recorrido = recorrer_paralelo(dir_path, exclude_patterns, workers, seguir_enlaces, cache)
+        return FileHandler.lineas_recorrido(recorrido, usar_iconos)
+
+    @staticmethod
+    def iter_renderizado(raiz: 'Nodo', usar_iconos: bool):
+        """Genera perezosamente las líneas de un árbol ya escaneado"""
+        return FileHandler.lineas_recorrido(raiz.recorrer(), usar_iconos)
+
+    @staticmethod
+    def lineas_subarbol(nodo: 'Nodo', ultimos: list, usar_iconos: bool):
+        """
+        Renderiza solo los descendientes de un nodo ubicado con Nodo.ubicar, con la
+        indentación o los prefijos que les corresponden dentro del árbol completo
+        """
+        if usar_iconos:
+            return FileHandler._lineas_iconos(nodo.recorrer(), len(ultimos))
+        prefijo = ''.join("    " if ultimo else "│   " for ultimo in ultimos)
+        return FileHandler._lineas_arbol(nodo.recorrer(), prefijo)
+
+    @staticmethod
+    def lotes(lineas, tamano: int = 1000):
+        """Agrupa un iterable de líneas en listas de como máximo `tamano` elementos"""
+        lineas = iter(lineas)
+        while True:
+            lote = list(islice(lineas, tamano))
+            if not lote:
+                return
+            yield lote
+
+    @staticmethod
+    def escribir_lineas(f, lineas):
+        """Escribe líneas separadas por saltos de línea sin construir el documento completo"""
+        separador = ""
+        for lote in FileHandler.lotes(lineas):
+            f.write(separador + "\n".join(lote))
+            separador = "\n"
+
     @staticmethod
     def generar_estructura_iconos(dir_path: str, level: int = 0, exclude_patterns=None) -> str:
         """Genera estructura con iconos"""
-        if exclude_patterns is None:
-            exclude_patterns = ['.git', '__pycache__', '.pytest_cache', '.venv', 'node_modules']
-            
-        result = []
         try:
-            base_path = Path(dir_path)
-            if not any(base_path.iterdir()):
+            result = list(FileHandler._lineas_iconos(recorrer(dir_path, exclude_patterns), level))
+            if not result:
                 return "📂 Directorio vacío"
-                
-            items = sorted(
-                [item for item in base_path.iterdir() 
-                 if not any(pattern in str(item) for pattern in exclude_patterns)],
-                key=lambda x: (not x.is_dir(), x.name.lower())
-            )
-            
-            for item in items:
-                indent = "  " * level
-                if item.is_file():
-                    icon = FileHandler._get_file_icon(item.suffix)
-                    result.append(f"{indent}{icon} {item.name}")
-                elif item.is_dir():
-                    result.append(f"{indent}📁 {item.name}/")
-                    subdir_content = FileHandler.generar_estructura_iconos(
-                        item, level + 1, exclude_patterns
-                    )
-                    if subdir_content:
-                        result.append(subdir_content)
-                        
             return "\n".join(result)
         except Exception as e:
-            logger.error(f"Error generando estructura con iconos: {str(e)}")
+            logger.error("Error generando estructura con iconos: %s", e)
             raise
 
     @staticmethod
     def generar_estructura_arbol(dir_path: str, level: int = 0, prefix="", exclude_patterns=None) -> str:
         """Genera estructura estilo árbol"""
-        if exclude_patterns is None:
-            exclude_patterns = ['.git', '__pycache__', '.pytest_cache', '.venv', 'node_modules']
-                
-        result = []
         try:
-            base_path = Path(dir_path)
-            if not any(base_path.iterdir()):
+            result = list(FileHandler._lineas_arbol(recorrer(dir_path, exclude_patterns), prefix))
+            if not result:
                 return "└── Directorio vacío"
-                    
-            items = sorted(
-                [item for item in base_path.iterdir() 
-                if not any(pattern in str(item) for pattern in exclude_patterns)],
-                key=lambda x: (not x.is_dir(), x.name.lower())
-            )
-                
-            for i, item in enumerate(items):
-                is_last = i == len(items) - 1
-                current_prefix = prefix + ("└── " if is_last else "├── ")
-                    
-                if item.is_file():
-                    result.append(f"{current_prefix}{item.name}")
-                elif item.is_dir():
-                    result.append(f"{current_prefix}{item.name}/")
-                    next_prefix = prefix + ("    " if is_last else "│   ")
-                    subdir_content = FileHandler.generar_estructura_arbol(
-                        item, level + 1, next_prefix, exclude_patterns
-                    )
-                    if subdir_content:
-                        result.append(subdir_content)
-                            
             return "\n".join(result)
         except Exception as e:
-            logger.error(f"Error generando estructura árbol: {str(e)}")
+            logger.error("Error generando estructura árbol: %s", e)
             raise
+
+    @staticmethod
+    def renderizar_iconos(raiz: 'Nodo') -> str:
+        """Genera estructura con iconos a partir de un árbol ya escaneado"""
+        result = list(FileHandler.iter_renderizado(raiz, True))
+        if not result:
+            return "📂 Directorio vacío"
+        return "\n".join(result)
+
+    @staticmethod
+    def renderizar_arbol(raiz: 'Nodo') -> str:
+        """Genera estructura estilo árbol a partir de un árbol ya escaneado"""
+        result = list(FileHandler.iter_renderizado(raiz, False))
+        if not result:
+            return "└── Directorio vacío"
+        return "\n".join(result)
     
     @staticmethod
-    def validar_estructura_markdown(estructura: str) -> bool:
+    def validar_estructura_markdown(estructura) -> bool:
         """Valida que la estructura esté en formato markdown válido"""
         try:
-            # Si la estructura está vacía, no es válida
-            if not estructura.strip():
-                return False
-
-            lineas = [l for l in estructura.split('\n') if l.strip()]
-            niveles_validos = set()
-            nivel_anterior = 0
-            
-            for linea in lineas:
-                # Calcular nivel basado en la indentación
-                indentacion = len(re.match(r'^\s*', linea).group())
-                nivel = indentacion // 2  # Cambiado de 4 a 2 para ser más flexible
-                
-                # Registrar el nivel como válido
-                niveles_validos.add(nivel)
-                
-                # Permitir cualquier nivel en la primera línea
-                if len(niveles_validos) == 1:
-                    nivel_anterior = nivel
-                    continue
-                
-                # Verificar si hay símbolos de estructura
-                tiene_simbolos = bool(re.search(r'[├└][-─]', linea))
-                
-                # Si la línea no tiene símbolos pero tiene contenido, tratarla como contenido válido
-                if not tiene_simbolos and linea.strip():
-                    continue
-                
-                # La diferencia de nivel no debería ser mayor que la profundidad máxima actual
-                if nivel > max(niveles_validos) + 1:
-                    return False
-                
-                nivel_anterior = nivel
-            
-            return True
+            if isinstance(estructura, str):
+                estructura = analizar_estructura(estructura)
+            return estructura.es_valida
             
         except Exception as e:
-            logger.error(f"Error validando estructura: {str(e)}")
+            logger.error("Error validando estructura: %s", e)
             return False
         
     @staticmethod
-    def guardar_estructura(filename: str, estructura: str, usar_iconos: bool):
-        """Guarda la estructura en un archivo"""
+    def abrir_salida(filename: str):
+        """
+        Abre un archivo de texto UTF-8 para escribir con un buffer grande. Según la
+        extensión se comprime al vuelo: .gz (gzip), .xz/.lzma (lzma) o .zst (zstd,
+        disponible desde Python 3.14).
+        """
+        extension_archivo = os.path.splitext(filename)[1].lower()
+        if extension_archivo == '.gz':
+            return gzip.open(filename, 'wt', encoding='utf-8', compresslevel=6)
+        if extension_archivo in ('.xz', '.lzma'):
+            formato = lzma.FORMAT_XZ if extension_archivo == '.xz' else lzma.FORMAT_ALONE
+            return lzma.open(filename, 'wt', encoding='utf-8', format=formato, preset=6)
+        if extension_archivo == '.zst':
+            if zstd is None:
+                raise ValueError("La compresión .zst requiere Python 3.14 o superior; usa .gz o .xz")
+            return zstd.open(filename, 'wt', encoding='utf-8')
+        return open(filename, 'w', encoding='utf-8', buffering=FileHandler.BUFFER_ESCRITURA)
+
+    @staticmethod
+    def guardar_estructura(filename: str, estructura, usar_iconos: bool):
+        """
+        Guarda la estructura en un archivo (comprimido según la extensión, ver
+        abrir_salida). `estructura` puede ser el texto completo o un iterable de
+        líneas (p. ej. iter_estructura o iter_renderizado), que se escribe a medida
+        que llega sin armar el documento en memoria.
+        """
         try:
             fecha_actual = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
             encabezado = f"""# Estructura de Directorios
@@ -204,14 +202,20 @@ class FileHandler:
             Modo: {"Iconos" if usar_iconos else "Árbol"}
 
             ```
-            {estructura}
+            """
+            pie = """
             ```
             """
-            with open(filename, 'w', encoding='utf-8') as f:
+            with FileHandler.abrir_salida(filename) as f:
                 f.write(encabezado)
+                if isinstance(estructura, str):
+                    f.write(estructura)
+                else:
+                    FileHandler.escribir_lineas(f, estructura)
+                f.write(pie)
                 
         except Exception as e:
-            logger.error(f"Error al guardar estructura: {str(e)}")
+            logger.error("Error al guardar estructura: %s", e)
             raise
 
     @staticmethod
@@ -278,92 +282,272 @@ class FileHandler:
         return icons.get(extension, '📄')
 
 class Nodo:
-    def __init__(self, nombre, es_directorio=False):
-        self.nombre = nombre
+    """
+    Nodo del árbol en memoria. Para que árboles de millones de entradas sean viables
+    no tiene __dict__ (__slots__), los archivos comparten una tupla vacía en lugar de
+    una lista de hijos propia y los nombres se internan (los repetidos, como
+    __init__.py o index.js, se guardan una sola vez).
+    """
+    __slots__ = ('nombre', 'es_directorio', 'hijos', 'nivel', 'es_enlace')
+    LOTE_CREACION = 256  # Rutas por tarea al crear estructuras en paralelo
+
+    def __init__(self, nombre, es_directorio=False, nivel=0, es_enlace=False):
+        self.nombre = sys.intern(nombre)
         self.es_directorio = es_directorio
-        self.hijos = []
-        self.nivel = 0
+        self.hijos = [] if es_directorio else ()
+        self.nivel = nivel
+        self.es_enlace = es_enlace  # Enlace simbólico (solo se recorre si se siguen enlaces)
 
     @staticmethod
-    def crear_estructura(estructura: str, base_path: str, usar_iconos: bool):
+    def desde_directorio(dir_path: str, exclude_patterns=None, workers: int = 1,
+                         seguir_enlaces: bool = False, cache=None) -> 'Nodo':
         """
-        Crea la estructura de directorios a partir del markdown
+        Escanea un directorio una sola vez y devuelve su árbol en memoria,
+        listo para renderizarse en cualquier modo sin volver a leer el disco.
+        Con workers > 1 los listados se hacen en paralelo (útil en unidades de red) y
+        con una ScanCache solo se vuelven a listar los directorios modificados.
         """
-        if not estructura.strip():
-            raise ValueError("La estructura está vacía")
-                
         try:
-            lineas = [l for l in estructura.split('\n') if l.strip()]
-            raiz = Nodo("root", True)
-            ultimo_nodo = {-1: raiz}  # Diccionario de último nodo por nivel
-            
-            logger.info("Construyendo árbol de directorios...")
+            raiz = Nodo(Path(dir_path).name, True)
+            recorrido = recorrer_paralelo(dir_path, exclude_patterns, workers, seguir_enlaces, cache)
+            for _ in Nodo.construir(raiz, recorrido):
+                pass
+            return raiz
+        except Exception as e:
+            logger.error("Error escaneando directorio: %s", e)
+            raise
+
+    @staticmethod
+    def construir(raiz: 'Nodo', recorrido, nivel_base: int = 0):
+        """
+        Agrega a raiz los nodos de un recorrido del escáner a medida que avanza
+        y los reemite como (nivel, nodo, es_ultimo) para poder renderizar a la vez
+        """
+        padres = [raiz]  # padres[n] es el directorio que recibe las entradas del nivel n
+        for nivel, entrada, es_ultimo in recorrido:
+            nodo = Nodo(entrada.nombre, entrada.es_directorio, nivel_base + nivel,
+                        getattr(entrada, 'es_enlace', False))
+            padres[nivel].hijos.append(nodo)
+            if entrada.es_directorio:
+                del padres[nivel + 1:]
+                padres.append(nodo)
+            yield nivel, nodo, es_ultimo
+
+    def recorrer(self):
+        """Recorre los descendientes en preorden produciendo (nivel, nodo, es_ultimo)"""
+        pila = [[self.hijos, 0]]
+        while pila:
+            marco = pila[-1]
+            hijos, indice = marco
+            if indice >= len(hijos):
+                pila.pop()
+                continue
+            marco[1] = indice + 1
+            hijo = hijos[indice]
+            yield len(pila) - 1, hijo, indice == len(hijos) - 1
+            if hijo.es_directorio:
+                pila.append([hijo.hijos, 0])
+
+    def contar_descendientes(self) -> int:
+        """Cantidad de líneas que ocupan los descendientes al renderizar"""
+        return sum(1 for _ in self.recorrer())
+
+    def directorios(self, seguir_enlaces: bool = False):
+        """
+        Produce la ruta relativa ('a/b') de cada subdirectorio, incluida la raíz (''),
+        sin los enlaces a directorios salvo con seguir_enlaces
+        """
+        yield ''
+        rutas = ['']  # rutas[n] es la ruta relativa del directorio padre del nivel n
+        for nivel, nodo, _ in self.recorrer():
+            if nodo.es_directorio and (seguir_enlaces or not nodo.es_enlace):
+                ruta = f"{rutas[nivel]}/{nodo.nombre}" if rutas[nivel] else nodo.nombre
+                del rutas[nivel + 1:]
+                rutas.append(ruta)
+                yield ruta
+
+    def buscar(self, rel_dir: str):
+        """Devuelve el nodo del directorio rel_dir ('a/b') o None si no está en el árbol"""
+        nodo = self
+        for parte in (rel_dir.split('/') if rel_dir else []):
+            for hijo in nodo.hijos:
+                if hijo.es_directorio and hijo.nombre == parte:
+                    nodo = hijo
+                    break
+            else:
+                return None
+        return nodo
+
+    def ubicar(self, rel_dir: str):
+        """
+        Busca el directorio rel_dir dentro del árbol. Devuelve (nodo, linea, ultimos), donde
+        linea es el índice de su línea en el renderizado (-1 para la raíz) y ultimos indica,
+        para cada nodo del camino, si es el último hijo de su padre. None si no existe.
+        """
+        nodo = self
+        linea = -1
+        ultimos = []
+        for parte in (rel_dir.split('/') if rel_dir else []):
+            for indice, hijo in enumerate(nodo.hijos):
+                if hijo.es_directorio and hijo.nombre == parte:
+                    break
+                linea += 1 + hijo.contar_descendientes()
+            else:
+                return None
+            linea += 1
+            ultimos.append(indice == len(nodo.hijos) - 1)
+            nodo = hijo
+        return nodo, linea, ultimos
+
+    def actualizar(self, dir_raiz: str, rel_dir: str, exclude_patterns=None,
+                   seguir_enlaces: bool = False) -> list:
+        """
+        Vuelve a listar este directorio (rel_dir dentro del escaneo de dir_raiz) y aplica
+        los cambios solo en su subárbol: los hijos que siguen existiendo conservan sus
+        nodos y los directorios a_vigilar se escanean completos. Devuelve las rutas
+        relativas de los directorios que hay que vigilar: los a_vigilar con todos sus
+        subdirectorios y los subdirectorios que ya estaban, porque uno borrado y vuelto
+        a crear conserva su nodo pero perdió su vigilancia. Un enlace a un directorio
+        no se lista salvo con seguir_enlaces.
+        """
+        if self.es_enlace and not seguir_enlaces:
+            return []
+        entradas, exclusiones = listar_subdirectorio(dir_raiz, rel_dir, exclude_patterns)
+        anteriores = {(hijo.nombre, hijo.es_directorio, hijo.es_enlace): hijo for hijo in self.hijos}
+        nivel_hijos = self.nivel + 1 if rel_dir else 0
+        hijos = []
+        a_vigilar = []
+        
+        for entrada in entradas:
+            hijo = anteriores.get((entrada.nombre, entrada.es_directorio, entrada.es_enlace))
+            if hijo is not None:
+                if hijo.es_directorio and (seguir_enlaces or not hijo.es_enlace):
+                    a_vigilar.append(f"{rel_dir}/{hijo.nombre}" if rel_dir else hijo.nombre)
+            else:
+                hijo = Nodo(entrada.nombre, entrada.es_directorio, nivel_hijos, entrada.es_enlace)
+                if entrada.es_directorio and (seguir_enlaces or not entrada.es_enlace):
+                    rel_hijo = f"{rel_dir}/{entrada.nombre}" if rel_dir else entrada.nombre
+                    recorrido = recorrer(entrada.ruta, exclusiones, seguir_enlaces, rel_dir=rel_hijo)
+                    for _ in Nodo.construir(hijo, recorrido, nivel_hijos + 1):
+                        pass
+                    a_vigilar.extend(
+                        f"{rel_hijo}/{ruta}" if ruta else rel_hijo for ruta in hijo.directorios(seguir_enlaces)
+                    )
+            hijos.append(hijo)
             
-            for linea in lineas:
-                # Calculo de nivel basado en la cantidad de caracteres de indentación
-                # incluidos los caracteres especiales
-                nivel = 0
-                for char in linea:
-                    if char in ['│', ' ']:
-                        nivel += 1
-                    else:
-                        break
-                nivel = nivel // 4  # Convertir a nivel real
-                
-                logger.info(f"Procesando línea: [{linea}]")
-                logger.info(f"Nivel calculado: {nivel}")
-                
-                match = re.search(r'[├└]──\s*(.+?)$', linea)
-                if not match:
-                    logger.info(f"No se encontró patrón en la línea: [{linea}]")
-                    continue
-                    
-                nombre = match.group(1).strip()
-                es_directorio = nombre.endswith('/')
-                nombre = nombre.rstrip('/')
-                
-                # Debug: mostrar información del nodo
-                logger.info(f"Nombre extraído: [{nombre}]")
-                logger.info(f"Es directorio: {es_directorio}")
-                
-                # Creacion de nuevo nodo
-                nuevo_nodo = Nodo(nombre, es_directorio)
-                nuevo_nodo.nivel = nivel
+        self.hijos = hijos
+        return a_vigilar
+
+    @staticmethod
+    def planificar(estructura, base_path: str) -> PlanCreacion:
+        """
+        Compara una estructura (texto o EstructuraAnalizada) con el destino sin modificarlo:
+        qué falta crear, qué ya existe y qué entradas chocan con otra de distinto tipo
+        """
+        if isinstance(estructura, str):
+            estructura = analizar_estructura(estructura)
+        return PlanCreacion.desde_estructura(estructura, base_path)
+
+    @staticmethod
+    def _crear_directorio(ruta: str):
+        """Crea un directorio cuyo padre ya existe (un solo mkdir)"""
+        logger.debug("Creando directorio: %s", ruta)
+        try:
+            os.mkdir(ruta)
+        except FileExistsError:
+            if not os.path.isdir(ruta):
+                raise
+        except FileNotFoundError:
+            # Nombres con subdirectorios ("src/utils/") necesitan sus intermedios
+            os.makedirs(ruta, exist_ok=True)
+
+    @staticmethod
+    def _crear_archivo(ruta: str):
+        """Crea un archivo vacío (sin truncarlo si ya existe)"""
+        logger.debug("Creando archivo: %s", ruta)
+        try:
+            fd = os.open(ruta, os.O_WRONLY | os.O_CREAT, 0o666)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            fd = os.open(ruta, os.O_WRONLY | os.O_CREAT, 0o666)
+        os.close(fd)
+
+    @staticmethod
+    def _en_paralelo(pool, funcion, rutas: list):
+        """Aplica funcion a las rutas repartidas en lotes entre los hilos del pool"""
+        def procesar(lote):
+            for ruta in lote:
+                funcion(ruta)
                 
-                # Encontrar el padre correcto para este nodo
-                padre = ultimo_nodo.get(nivel - 1, raiz)
-                padre.hijos.append(nuevo_nodo)
-                ultimo_nodo[nivel] = nuevo_nodo
+        lotes = [rutas[i:i + Nodo.LOTE_CREACION] for i in range(0, len(rutas), Nodo.LOTE_CREACION)]
+        if pool is None or len(lotes) <= 1:
+            for lote in lotes:
+                procesar(lote)
+        else:
+            for _ in pool.map(procesar, lotes):
+                pass
+
+    @staticmethod
+    def crear_estructura(estructura, base_path: str, usar_iconos: bool, workers: int = 8,
+                         plan: PlanCreacion = None) -> dict:
+        """
+        Crea la estructura de directorios a partir del markdown
+        (el texto o una EstructuraAnalizada ya obtenida con analizar_estructura).
+
+        Solo se crea lo que falta en el destino (ver planificar; si ya se calculó el plan
+        para mostrarlo se puede pasar en `plan`). Los directorios se crean nivel por nivel,
+        de modo que el padre de cada uno ya existe y basta un mkdir; después se crean
+        los archivos. Cada fase se reparte entre `workers` hilos, lo que acelera mucho
+        las unidades de red. Devuelve {'directorios', 'archivos', 'existentes', 'segundos'}.
+        """
+        if isinstance(estructura, str):
+            if not estructura.strip():
+                raise ValueError("La estructura está vacía")
+            estructura = analizar_estructura(estructura)
                 
-                logger.info(f"Nodo creado - Nivel: {nivel}, Nombre: {nombre}, " +
-                        f"Es directorio: {es_directorio}, Padre: {padre.nombre}")
-                logger.info("-" * 50)
+        try:
+            if estructura.errores:
+                numero, mensaje = estructura.errores[0]
+                raise ValueError(f"Línea {numero}: {mensaje}")
+            if not estructura.entradas:
+                raise ValueError("La estructura no contiene entradas")
             
             # Creacion de estructura física
             logger.info("Creando estructura física...")
+            inicio = time.perf_counter()
+            if plan is None:
+                plan = Nodo.planificar(estructura, base_path)
+            if plan.conflictos:
+                ruta, mensaje = plan.conflictos[0]
+                raise ValueError(f"{mensaje}: {ruta}")
+            niveles, archivos = plan.niveles, plan.archivos
+            os.makedirs(base_path, exist_ok=True)
             
-            def crear_estructura_fisica(nodo, ruta_actual):
-                ruta_nodo = ruta_actual / nodo.nombre
-                
-                if nodo.es_directorio:
-                    logger.info(f"Creando directorio: {ruta_nodo}")
-                    ruta_nodo.mkdir(parents=True, exist_ok=True)
-                    
-                    # Creacion de hijos
-                    for hijo in nodo.hijos:
-                        crear_estructura_fisica(hijo, ruta_nodo)
-                else:
-                    logger.info(f"Creando archivo: {ruta_nodo}")
-                    ruta_nodo.parent.mkdir(parents=True, exist_ok=True)
-                    ruta_nodo.touch()
-            
-            # Creacion de la estructura física empezando desde los hijos de la raíz
-            base_path = Path(base_path)
-            for hijo in raiz.hijos:
-                crear_estructura_fisica(hijo, base_path)
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='creador') if workers > 1 else None
+            try:
+                # El detalle de cada entrada va a DEBUG; en INFO solo un resumen por fase
+                for profundidad, directorios in enumerate(niveles):
+                    if directorios:
+                        logger.info("Creando %d directorios de profundidad %d", len(directorios), profundidad)
+                        Nodo._en_paralelo(pool, Nodo._crear_directorio, directorios)
+                logger.info("Creando %d archivos", len(archivos))
+                Nodo._en_paralelo(pool, Nodo._crear_archivo, archivos)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
             
-            return True
+            resultado = {
+                'directorios': sum(len(directorios) for directorios in niveles),
+                'archivos': len(archivos),
+                'existentes': plan.existentes,
+                'segundos': time.perf_counter() - inicio
+            }
+            total = resultado['directorios'] + resultado['archivos']
+            logger.info("Estructura creada: %d directorios y %d archivos en %.2fs (%.0f entradas/s), "
+                        "%d ya existían", resultado['directorios'], resultado['archivos'],
+                        resultado['segundos'], total / max(resultado['segundos'], 1e-6), plan.existentes)
+            return resultado
                 
         except Exception as e:
-            logger.error(f"Error al crear estructura: {str(e)}")
+            logger.error("Error al crear estructura: %s", e)
             raise
@@ -1,4 +1,7 @@
+import atexit
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from colorama import init, Fore, Style
 
 # Inicializar colorama
@@ -13,27 +16,48 @@ class ColoredFormatter(logging.Formatter):
             color = Fore.YELLOW
         else:
             color = Fore.GREEN
-        
-        record.msg = f"{color}{record.msg}{Style.RESET_ALL}"
-        return super().format(record)
+
+        # Se colorea el texto ya formateado: el registro no se modifica, así que los
+        # códigos ANSI no llegan a los demás handlers (p. ej. el del archivo)
+        return f"{color}{super().format(record)}{Style.RESET_ALL}"
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Encola los registros sin formatearlos. QueueHandler los formatea en el hilo que
+    registra; aquí eso queda para el hilo del listener, que es el que escribe. El
+    listener vive en el mismo proceso, así que los argumentos y la excepción siguen
+    siendo válidos cuando se formatean.
+    """
+    def prepare(self, record):
+        return record
 
 def setup_logger():
-    """Configura y retorna el logger"""
+    """
+    Configura y retorna el logger. Los mensajes se encolan y un QueueListener los
+    escribe en la consola y en convertidor.log desde otro hilo, de modo que registrar
+    no bloquea al hilo que crea o escanea estructuras.
+    """
     logger = logging.getLogger('ConvertidorDirectorios')
     logger.setLevel(logging.INFO)
-    
+
     # Evitar duplicados de handlers
     if logger.handlers:
         return logger
-    
+
     # Handler para consola
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(ColoredFormatter('%(asctime)s - %(message)s'))
-    logger.addHandler(console_handler)
-    
+
     # Handler para archivo
     file_handler = logging.FileHandler('convertidor.log', encoding='utf-8')
     file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-    logger.addHandler(file_handler)
-    
+
+    cola = queue.SimpleQueue()
+    listener = QueueListener(cola, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    # Vaciar la cola antes de salir para no perder los últimos mensajes
+    atexit.register(listener.stop)
+
+    logger.addHandler(_DeferredQueueHandler(cola))
+
     return logger
@@ -0,0 +1,265 @@
+"""
+Formatos de salida de una estructura: texto (árbol, iconos, compatible con tree)
+y datos (JSON, NDJSON, CSV, HTML) para que otras herramientas no tengan que
+volver a analizar el texto.
+
+Cada renderizador recibe un recorrido (nivel, entrada, es_ultimo) en preorden,
+el del escáner, Nodo.recorrer o EstructuraAnalizada.recorrer, y genera líneas
+sin armar el documento completo.
+"""
+
+import csv
+import html
+import io
+import json
+import os
+
+from .file_handler import FileHandler
+from .scanner import clave_orden_tree, extension
+
+
+class Formato:
+    """
+    Renderizador registrado: renderizar(recorrido, raiz, dir_raiz) genera las líneas.
+    Al escanear para este formato, `orden` es la clave con que se ordenan los hermanos
+    (None = la del escáner) y con `muestra_todo` se listan también enlaces rotos y
+    archivos especiales, y no se aplican las exclusiones por defecto ni los .gitignore
+    salvo que se pidan.
+    """
+    __slots__ = ('nombre', 'extension', 'descripcion', 'renderizar', 'orden', 'muestra_todo')
+
+    def __init__(self, nombre, extension, descripcion, renderizar, orden=None, muestra_todo=False):
+        self.nombre = nombre
+        self.extension = extension
+        self.descripcion = descripcion
+        self.renderizar = renderizar
+        self.orden = orden
+        self.muestra_todo = muestra_todo
+
+
+FORMATOS = {}
+FORMATOS_TEXTO = ('arbol', 'iconos')  # Los que guardar_estructura envuelve en markdown
+EXTENSIONES_COMPRESION = ('.gz', '.xz', '.lzma', '.zst')
+EXTENSIONES_TEXTO = ('.md', '.txt')  # No indican formato: quien guarda elige árbol o iconos
+
+
+def registrar_formato(nombre: str, extension: str, descripcion: str, orden=None, muestra_todo: bool = False):
+    """Decorador que registra un renderizador con su nombre y extensión de archivo"""
+    def registrar(funcion):
+        FORMATOS[nombre] = Formato(nombre, extension, descripcion, funcion, orden, muestra_todo)
+        return funcion
+    return registrar
+
+
+def formato_por_extension(filename: str):
+    """Formato de datos que corresponde a la extensión del archivo (ignorando la compresión), o None"""
+    base, extension_archivo = os.path.splitext(filename.lower())
+    if extension_archivo in EXTENSIONES_COMPRESION:
+        extension_archivo = os.path.splitext(base)[1]
+    if extension_archivo == '.jsonl':
+        return 'ndjson'
+    if extension_archivo == '.htm':
+        return 'html'
+    for formato in FORMATOS.values():
+        if extension_archivo not in EXTENSIONES_TEXTO and formato.extension == extension_archivo:
+            return formato.nombre
+    return None
+
+
+def renderizar(formato: str, recorrido, raiz: str, dir_raiz: str = None):
+    """
+    Líneas de un recorrido en el formato indicado. `raiz` es el nombre (o la ruta
+    tal como se escribió) del directorio raíz; con `dir_raiz` se obtienen los tamaños
+    de los archivos de un árbol en memoria (las entradas del escáner ya traen su ruta).
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: {formato} (disponibles: {', '.join(FORMATOS)})")
+    return FORMATOS[formato].renderizar(recorrido, raiz, dir_raiz)
+
+
+def exportar(filename: str, formato: str, recorrido, raiz: str, dir_raiz: str = None):
+    """
+    Escribe un recorrido en un archivo. Los formatos de texto llevan el encabezado de
+    guardar_estructura; los de datos se escriben tal cual. La compresión depende de
+    la extensión (ver FileHandler.abrir_salida).
+    """
+    if formato in FORMATOS_TEXTO:
+        FileHandler.guardar_estructura(
+            filename, renderizar(formato, recorrido, raiz, dir_raiz), formato == 'iconos'
+        )
+        return
+    with FileHandler.abrir_salida(filename) as f:
+        FileHandler.escribir_lineas(f, renderizar(formato, recorrido, raiz, dir_raiz))
+        f.write("\n")
+
+
+def _con_rutas(recorrido):
+    """Agrega a cada elemento del recorrido la ruta relativa a la raíz"""
+    # rutas[n] es la ruta del directorio que contiene las entradas del nivel n
+    rutas = ['']
+    for nivel, entrada, es_ultimo in recorrido:
+        ruta = rutas[nivel] + entrada.nombre
+        if entrada.es_directorio:
+            del rutas[nivel + 1:]
+            rutas.append(ruta + '/')
+        yield nivel, entrada, es_ultimo, ruta
+
+
+def _tamano(entrada, ruta: str, dir_raiz):
+    """Tamaño en bytes de un archivo, o None si es un directorio o no se puede consultar"""
+    if entrada.es_directorio:
+        return None
+    if getattr(entrada, 'tamano', None) is not None:
+        return entrada.tamano  # Guardado en una instantánea
+    ruta_disco = getattr(entrada, 'ruta', None)
+    if ruta_disco is None:
+        if dir_raiz is None:
+            return None
+        ruta_disco = os.path.join(dir_raiz, ruta)
+    try:
+        return os.stat(ruta_disco).st_size
+    except OSError:
+        return None
+
+
+def _tipo(entrada) -> str:
+    return 'directorio' if entrada.es_directorio else 'archivo'
+
+
+@registrar_formato('arbol', '.md', "árbol con └── y ├── (el formato del editor)")
+def _renderizar_arbol(recorrido, raiz, dir_raiz):
+    return FileHandler.lineas_recorrido(recorrido, False)
+
+
+@registrar_formato('iconos', '.md', "indentación con iconos")
+def _renderizar_iconos(recorrido, raiz, dir_raiz):
+    return FileHandler.lineas_recorrido(recorrido, True)
+
+
+@registrar_formato('tree', '.txt', "igual que tree -a --dirsfirst (al escanear: orden de tree y sin exclusiones por defecto)",
+                   orden=clave_orden_tree, muestra_todo=True)
+def _renderizar_tree(recorrido, raiz, dir_raiz):
+    # Las entradas salen en el orden del recorrido: al escanear para este formato es el
+    # de tree (ver Formato.orden); al renderizar un texto o una instantánea, el guardado.
+    # tree separa las ramas con dos espacios de no separación y un espacio
+    prefijos = ['']
+    directorios = archivos = 0
+    yield raiz
+    for nivel, entrada, es_ultimo in recorrido:
+        nombre = entrada.nombre
+        if getattr(entrada, 'es_enlace', False):
+            destino = getattr(entrada, 'destino', None)  # Guardado en una instantánea
+            if destino is None and getattr(entrada, 'ruta', None) is not None:
+                try:
+                    destino = os.readlink(entrada.ruta)
+                except OSError:
+                    pass
+            if destino is not None:
+                nombre = f"{nombre} -> {destino}"
+        yield prefijos[nivel] + ("└── " if es_ultimo else "├── ") + nombre
+        if entrada.es_directorio:
+            directorios += 1
+            del prefijos[nivel + 1:]
+            prefijos.append(prefijos[nivel] + ("    " if es_ultimo else "│\u00a0\u00a0 "))
+        else:
+            archivos += 1
+    yield ""
+    yield (f"{directorios} director{'y' if directorios == 1 else 'ies'}, "
+           f"{archivos} file{'' if archivos == 1 else 's'}")
+
+
+@registrar_formato('json', '.json', "un objeto anidado por directorio, con sus hijos")
+def _renderizar_json(recorrido, raiz, dir_raiz):
+    # Los directorios abiertos se cierran al volver a un nivel menor; es_ultimo decide la coma
+    nombre_raiz = os.path.basename(os.path.normpath(raiz)) or raiz
+    yield f'{{"nombre": {json.dumps(nombre_raiz, ensure_ascii=False)}, "tipo": "directorio", "hijos": ['
+    abiertos = []  # es_ultimo de cada directorio abierto; su nivel es la posición
+    for nivel, entrada, es_ultimo, ruta in _con_rutas(recorrido):
+        while len(abiertos) > nivel:
+            ultimo = abiertos.pop()
+            yield "  " * (len(abiertos) + 1) + ("]}" if ultimo else "]},")
+        sangria = "  " * (nivel + 1)
+        nombre = json.dumps(entrada.nombre, ensure_ascii=False)
+        if entrada.es_directorio:
+            yield f'{sangria}{{"nombre": {nombre}, "tipo": "directorio", "hijos": ['
+            abiertos.append(es_ultimo)
+        else:
+            tamano = _tamano(entrada, ruta, dir_raiz)
+            bytes_json = "null" if tamano is None else tamano
+            yield f'{sangria}{{"nombre": {nombre}, "tipo": "archivo", "bytes": {bytes_json}}}' + ("" if es_ultimo else ",")
+    while abiertos:
+        ultimo = abiertos.pop()
+        yield "  " * (len(abiertos) + 1) + ("]}" if ultimo else "]},")
+    yield "]}"
+
+
+@registrar_formato('ndjson', '.ndjson', "un objeto JSON por línea y entrada")
+def _renderizar_ndjson(recorrido, raiz, dir_raiz):
+    for nivel, entrada, _, ruta in _con_rutas(recorrido):
+        yield json.dumps({
+            'ruta': ruta,
+            'nombre': entrada.nombre,
+            'tipo': _tipo(entrada),
+            'nivel': nivel,
+            'bytes': _tamano(entrada, ruta, dir_raiz),
+        }, ensure_ascii=False)
+
+
+@registrar_formato('csv', '.csv', "ruta, tipo, nivel y bytes por entrada")
+def _renderizar_csv(recorrido, raiz, dir_raiz):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='')
+
+    def fila(valores):
+        writer.writerow(valores)
+        linea = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return linea
+
+    yield fila(('ruta', 'tipo', 'nivel', 'bytes'))
+    for nivel, entrada, _, ruta in _con_rutas(recorrido):
+        tamano = _tamano(entrada, ruta, dir_raiz)
+        yield fila((ruta, _tipo(entrada), nivel, '' if tamano is None else tamano))
+
+
+_HTML_INICIO = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>{titulo}</title>
+<style>
+body {{ font-family: Consolas, Menlo, monospace; font-size: 14px; }}
+ul {{ list-style: none; margin: 0; padding-left: 1.4em; }}
+summary {{ cursor: pointer; }}
+li.archivo {{ padding-left: 1em; }}
+</style>
+</head>
+<body>
+<h1>📁 {titulo}</h1>
+<ul>"""
+
+_HTML_FIN = """</ul>
+</body>
+</html>"""
+
+
+@registrar_formato('html', '.html', "página con los directorios plegables")
+def _renderizar_html(recorrido, raiz, dir_raiz):
+    yield _HTML_INICIO.format(titulo=html.escape(raiz))
+    abiertos = 0
+    for nivel, entrada, _ in recorrido:
+        while abiertos > nivel:
+            abiertos -= 1
+            yield "</ul></details></li>"
+        nombre = html.escape(entrada.nombre)
+        if entrada.es_directorio:
+            yield f"<li><details><summary>📁 {nombre}/</summary><ul>"
+            abiertos += 1
+        else:
+            icono = FileHandler._get_file_icon(extension(entrada.nombre))
+            yield f'<li class="archivo">{icono} {nombre}</li>'
+    while abiertos:
+        abiertos -= 1
+        yield "</ul></details></li>"
+    yield _HTML_FIN
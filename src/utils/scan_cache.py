@@ -0,0 +1,110 @@
+"""
+Caché persistente de listados de directorio para reescaneos incrementales
+"""
+
+import json
+import os
+import threading
+import time
+import logging
+
+from .scanner import leer_directorio
+
+logger = logging.getLogger('ConvertidorDirectorios')
+
+
+class ScanCache:
+    """
+    Guarda en disco el listado crudo de cada directorio junto con su mtime.
+
+    El mtime de un directorio cambia cuando se crean, borran o renombran entradas
+    dentro de él, así que si no cambió su listado sigue siendo válido y basta un
+    stat en lugar de volver a listarlo. Los cambios en subdirectorios no alteran
+    el mtime de sus ancestros, por lo que cada subdirectorio se sigue comprobando
+    (con un stat) en cada reescaneo.
+
+    Los listados se guardan sin filtrar: las exclusiones y los .gitignore se
+    aplican después, de modo que cambiarlos no invalida la caché.
+    """
+
+    VERSION = 1
+    # Un directorio modificado hace menos de esto podría volver a cambiar dentro del
+    # mismo tick de mtime sin que se note, así que no se confía en su listado
+    MARGEN_MTIME_NS = 2_000_000_000
+
+    def __init__(self, archivo: str = 'cache_escaneo.json'):
+        self.archivo = archivo
+        self._directorios = {}  # ruta absoluta -> [mtime_ns, [[nombre, es_directorio, es_enlace], ...]]
+        self._cargada = False
+        self._raiz = None
+        self._visitados = set()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def cargar(self):
+        """Carga la caché desde disco (una sola vez)"""
+        if self._cargada:
+            return
+        self._cargada = True
+        try:
+            if os.path.exists(self.archivo):
+                with open(self.archivo, 'r', encoding='utf-8') as f:
+                    datos = json.load(f)
+                if datos.get('version') == self.VERSION:
+                    self._directorios = datos.get('directorios', {})
+        except Exception as e:
+            logger.warning("No se pudo cargar la caché de escaneo: %s", e)
+            self._directorios = {}
+
+    def iniciar_escaneo(self, dir_path: str):
+        """Prepara la caché para un escaneo de dir_path y reinicia las estadísticas"""
+        self.cargar()
+        with self._lock:
+            self._raiz = os.path.abspath(dir_path)
+            self._visitados = set()
+            self.aciertos = 0
+            self.fallos = 0
+
+    def leer(self, ruta) -> list:
+        """Devuelve el listado crudo de ruta, desde la caché si su mtime no cambió"""
+        clave = os.path.abspath(ruta)
+        mtime = os.stat(ruta).st_mtime_ns
+        self._visitados.add(clave)
+
+        registro = self._directorios.get(clave)
+        if registro is not None and registro[0] == mtime:
+            with self._lock:
+                self.aciertos += 1
+            return registro[1]
+
+        crudas = leer_directorio(ruta)
+        if time.time_ns() - mtime < self.MARGEN_MTIME_NS:
+            mtime = -1  # Se volverá a listar en el próximo escaneo
+        self._directorios[clave] = [mtime, crudas]
+        with self._lock:
+            self.fallos += 1
+        return crudas
+
+    def guardar(self, podar: bool = True):
+        """
+        Escribe la caché en disco. Con podar=True (escaneo completo) se descartan
+        los directorios bajo la raíz escaneada que ya no aparecieron (borrados o excluidos).
+        """
+        try:
+            directorios = dict(self._directorios)
+            if podar and self._raiz is not None:
+                prefijo = self._raiz.rstrip(os.sep) + os.sep
+                for clave in list(directorios):
+                    if clave not in self._visitados and (clave + os.sep).startswith(prefijo):
+                        del directorios[clave]
+
+            temporal = self.archivo + '.tmp'
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'directorios': directorios}, f,
+                          ensure_ascii=False, separators=(',', ':'))
+            os.replace(temporal, self.archivo)
+            logger.info("Caché de escaneo: %d directorios reutilizados, %d listados",
+                        self.aciertos, self.fallos)
+        except Exception as e:
+            logger.warning("No se pudo guardar la caché de escaneo: %s", e)
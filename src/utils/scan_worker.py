@@ -0,0 +1,111 @@
+"""
+Escaneo de directorios en un hilo de trabajo con progreso y cancelación
+"""
+
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+
+from .file_handler import FileHandler, Nodo
+from .scanner import recorrer_paralelo
+from .search_index import IndiceBusqueda
+from .snapshot import Instantanea
+
+logger = logging.getLogger('ConvertidorDirectorios')
+
+
+class ScanWorker:
+    """
+    Escanea un directorio fuera del hilo de Tk. Los resultados llegan por `cola`
+    como tuplas que la interfaz consume con window.after:
+
+        ('progreso', total_entradas, lineas_nuevas)
+        ('fin', arbol)
+        ('cancelado', arbol_parcial)
+        ('error', excepcion)
+
+    Durante el escaneo se llena `indice` (IndiceBusqueda); su tabla de trigramas
+    se arma después de entregar el árbol, así que hay que esperar a indice.listo.
+
+    Con `instantanea` (ruta de un .cdsnap) el árbol se lee de la instantánea en
+    lugar del disco, por el mismo camino; dir_path pasa a ser el directorio de origen.
+    """
+
+    LOTE_LINEAS = 2000
+    INTERVALO_PROGRESO = 0.1  # Segundos máximos entre mensajes de progreso
+
+    def __init__(self, dir_path: str, usar_iconos: bool, exclude_patterns=None, workers: int = 1,
+                 seguir_enlaces: bool = False, cache=None, instantanea: str = None):
+        self.dir_path = dir_path
+        self.instantanea = instantanea
+        self.usar_iconos = usar_iconos
+        self.exclude_patterns = exclude_patterns
+        self.workers = workers
+        self.seguir_enlaces = seguir_enlaces
+        self.cache = cache
+        self.cola = queue.Queue()
+        self.indice = IndiceBusqueda()
+        self._cancelado = threading.Event()
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+
+    def iniciar(self):
+        """Lanza el escaneo en segundo plano"""
+        self._hilo.start()
+
+    def cancelar(self):
+        """Solicita detener el escaneo; las entradas ya leídas se conservan"""
+        self._cancelado.set()
+
+    def _ejecutar(self):
+        """Cuerpo del hilo de trabajo"""
+        instantanea = None
+        try:
+            if self.instantanea is not None:
+                instantanea = Instantanea(self.instantanea)
+                self.dir_path = instantanea.origen
+                raiz = Nodo(instantanea.raiz, True)
+                walker = instantanea.recorrer()
+            else:
+                raiz = Nodo(Path(self.dir_path).name, True)
+                if self.cache is not None:
+                    self.cache.iniciar_escaneo(self.dir_path)
+                walker = recorrer_paralelo(
+                    self.dir_path, self.exclude_patterns, self.workers, self.seguir_enlaces, self.cache
+                )
+            recorrido = self.indice.indexar(Nodo.construir(raiz, walker))
+            lote = []
+            total = 0
+            ultimo_envio = time.monotonic()
+
+            for linea in FileHandler.lineas_recorrido(recorrido, self.usar_iconos):
+                if self._cancelado.is_set():
+                    walker.close()  # Libera el pool de hilos del recorrido paralelo
+                    self.cola.put(('progreso', total, lote))
+                    self.cola.put(('cancelado', raiz))
+                    self._guardar_cache(podar=False)
+                    self.indice.finalizar()
+                    return
+                lote.append(linea)
+                total += 1
+                if len(lote) >= self.LOTE_LINEAS or time.monotonic() - ultimo_envio >= self.INTERVALO_PROGRESO:
+                    self.cola.put(('progreso', total, lote))
+                    lote = []
+                    ultimo_envio = time.monotonic()
+
+            self.cola.put(('progreso', total, lote))
+            self.cola.put(('fin', raiz))
+            self._guardar_cache(podar=True)
+            self.indice.finalizar()
+        except Exception as e:
+            logger.error("Error escaneando en segundo plano: %s", e)
+            self.cola.put(('error', e))
+        finally:
+            if instantanea is not None:
+                instantanea.cerrar()
+
+    def _guardar_cache(self, podar):
+        """Persiste la caché de escaneo una vez entregado el resultado a la interfaz"""
+        if self.cache is not None:
+            self.cache.guardar(podar)
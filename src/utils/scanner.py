@@ -0,0 +1,283 @@
+"""
+Motor de escaneo de directorios basado en os.scandir
+"""
+
+import locale
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .exclusion import Exclusiones
+
+logger = logging.getLogger('ConvertidorDirectorios')
+
+VENTANA_POR_WORKER = 4  # Listados programados sin consumir por cada hilo de recorrer_paralelo
+
+
+class Entrada:
+    """Entrada de un directorio ya clasificada (archivo o directorio)"""
+    __slots__ = ('nombre', 'ruta', 'es_directorio', 'es_enlace')
+
+    def __init__(self, nombre, ruta, es_directorio, es_enlace=False):
+        self.nombre = nombre
+        self.ruta = ruta
+        self.es_directorio = es_directorio
+        self.es_enlace = es_enlace
+
+
+def _clave_orden(entrada):
+    """Directorios primero y luego por nombre sin distinguir mayúsculas"""
+    return (not entrada.es_directorio, entrada.nombre.lower())
+
+
+def clave_orden_tree(entrada):
+    """Orden de tree --dirsfirst: directorios primero y luego por nombre con strcoll (según LC_COLLATE)"""
+    try:
+        nombre = locale.strxfrm(entrada.nombre)
+    except (ValueError, UnicodeError):
+        nombre = entrada.nombre  # Nombres con bytes no decodificables
+    return (not entrada.es_directorio, nombre)
+
+
+def _ruta_relativa(rel_dir, nombre):
+    """Ruta relativa a la raíz del escaneo de una entrada de rel_dir"""
+    return f"{rel_dir}/{nombre}" if rel_dir else nombre
+
+
+def leer_directorio(ruta, todas: bool = False) -> list:
+    """
+    Lista un directorio con os.scandir y devuelve [(nombre, es_directorio, es_enlace)]
+    sin filtrar ni ordenar. La clasificación usa la caché de tipo de DirEntry, por lo
+    que en la mayoría de sistemas de archivos no requiere ninguna llamada stat. Los
+    enlaces rotos y los archivos especiales (fifos, sockets) solo se incluyen, como
+    archivos, con todas=True.
+    """
+    crudas = []
+    with os.scandir(ruta) as it:
+        for entry in it:
+            if entry.is_dir():
+                crudas.append((entry.name, True, entry.is_symlink()))
+            elif entry.is_file() or todas:
+                crudas.append((entry.name, False, entry.is_symlink()))
+    return crudas
+
+
+def _listar(ruta, rel_dir, exclusiones, cache=None, orden=None, todas=False):
+    """
+    Lee un directorio una sola vez (o lo toma de la caché) y devuelve (entradas, exclusiones),
+    donde las exclusiones devueltas incluyen el .gitignore del propio directorio y son
+    las que se aplican a sus subdirectorios. Las entradas excluidas no se devuelven,
+    así que los directorios excluidos nunca llegan a listarse. `orden` es la clave de
+    ordenación de las entradas (por defecto directorios primero y nombre sin mayúsculas) y
+    con `todas` se incluyen enlaces rotos y archivos especiales (ver leer_directorio).
+    """
+    crudas = cache.leer(ruta) if cache is not None and not todas else leer_directorio(ruta, todas)
+
+    if exclusiones.usar_gitignore and any(nombre == '.gitignore' for nombre, _, _ in crudas):
+        exclusiones = exclusiones.con_gitignore(ruta, rel_dir)
+
+    entradas = []
+    for nombre, es_directorio, es_enlace in crudas:
+        if exclusiones.excluido(_ruta_relativa(rel_dir, nombre), nombre, es_directorio):
+            continue
+        entradas.append(Entrada(nombre, os.path.join(ruta, nombre), es_directorio, es_enlace))
+
+    entradas.sort(key=orden or _clave_orden)
+    return entradas, exclusiones
+
+
+def listar_directorio(ruta, exclude_patterns=None) -> list:
+    """
+    Lee un directorio una sola vez con os.scandir y devuelve sus entradas ordenadas.
+    exclude_patterns admite patrones estilo .gitignore o un objeto Exclusiones.
+    """
+    return _listar(ruta, '', Exclusiones.desde(exclude_patterns))[0]
+
+
+def exclusiones_para(dir_raiz, rel_dir, exclude_patterns=None) -> Exclusiones:
+    """
+    Reconstruye las exclusiones con las que se lista rel_dir dentro de un escaneo de
+    dir_raiz: las globales más los .gitignore de la raíz y de los ancestros de rel_dir.
+    """
+    exclusiones = Exclusiones.desde(exclude_patterns)
+    if not exclusiones.usar_gitignore or not rel_dir:
+        return exclusiones
+
+    partes = rel_dir.split('/')
+    for i in range(len(partes)):
+        rel_ancestro = '/'.join(partes[:i])
+        ruta_ancestro = os.path.join(dir_raiz, *partes[:i])
+        if os.path.isfile(os.path.join(ruta_ancestro, '.gitignore')):
+            exclusiones = exclusiones.con_gitignore(ruta_ancestro, rel_ancestro)
+    return exclusiones
+
+
+def listar_subdirectorio(dir_raiz, rel_dir, exclude_patterns=None):
+    """
+    Lista un directorio interior de un escaneo aplicando las mismas reglas que el
+    recorrido completo. Devuelve (entradas, exclusiones_para_sus_hijos).
+    """
+    ruta = os.path.join(dir_raiz, *rel_dir.split('/')) if rel_dir else dir_raiz
+    return _listar(ruta, rel_dir, exclusiones_para(dir_raiz, rel_dir, exclude_patterns))
+
+
+def _clave_directorio(ruta):
+    """Identidad física de un directorio: (st_dev, st_ino)"""
+    st = os.stat(ruta)
+    return (st.st_dev, st.st_ino)
+
+
+def _cadena_raiz(dir_path, seguir_enlaces):
+    """Cadena de ancestros inicial para el directorio raíz"""
+    return (_clave_directorio(dir_path), ()) if seguir_enlaces else ()
+
+
+def _cadena_hijo(entrada, cadena, seguir_enlaces):
+    """
+    Aplica la política de enlaces simbólicos a un subdirectorio.
+
+    Devuelve la cadena de ancestros con la que listar sus hijos, o None si no hay
+    que descender (enlace no seguido o ciclo). La cadena es una lista enlazada
+    inmutable de claves (st_dev, st_ino): ((clave, padre), ..., ()). Solo un enlace
+    puede cerrar un ciclo, así que la cadena solo se recorre para los enlaces.
+    """
+    if not seguir_enlaces:
+        return None if entrada.es_enlace else cadena
+
+    clave = _clave_directorio(entrada.ruta)
+    if entrada.es_enlace:
+        ancestro = cadena
+        while ancestro:
+            if ancestro[0] == clave:
+                logger.warning("Ciclo de enlaces simbólicos omitido: %s", entrada.ruta)
+                return None
+            ancestro = ancestro[1]
+    return (clave, cadena)
+
+
+def recorrer(dir_path, exclude_patterns=None, seguir_enlaces=False, cache=None, rel_dir='', orden=None,
+             todas=False):
+    """
+    Recorre el árbol en profundidad (preorden) leyendo cada directorio una vez.
+    Produce tuplas (nivel, entrada, es_ultimo) en el orden de salida de los renderers.
+
+    El recorrido usa una pila explícita, por lo que no tiene límite de profundidad.
+    Los enlaces simbólicos a directorios se listan pero solo se recorren con
+    seguir_enlaces=True, y en ese caso se omiten los que apuntan a un ancestro.
+    Con una ScanCache, los directorios cuyo mtime no cambió no se vuelven a listar.
+    rel_dir es la ruta de dir_path dentro de un escaneo mayor (al recorrer un subárbol)
+    y `orden` la clave con que se ordenan los hermanos (p. ej. clave_orden_tree); con
+    `todas` también se listan enlaces rotos y archivos especiales.
+    """
+    entradas, exclusiones = _listar(dir_path, rel_dir, Exclusiones.desde(exclude_patterns), cache, orden, todas)
+    pila = [[entradas, 0, _cadena_raiz(dir_path, seguir_enlaces), rel_dir, exclusiones]]
+    while pila:
+        marco = pila[-1]
+        entradas, indice, cadena, rel_dir, exclusiones = marco
+        if indice >= len(entradas):
+            pila.pop()
+            continue
+        marco[1] = indice + 1
+        entrada = entradas[indice]
+        yield len(pila) - 1, entrada, indice == len(entradas) - 1
+        if entrada.es_directorio:
+            cadena_hijo = _cadena_hijo(entrada, cadena, seguir_enlaces)
+            if cadena_hijo is not None:
+                rel_hijo = _ruta_relativa(rel_dir, entrada.nombre)
+                hijos, exclusiones_hijo = _listar(entrada.ruta, rel_hijo, exclusiones, cache, orden, todas)
+                pila.append([hijos, 0, cadena_hijo, rel_hijo, exclusiones_hijo])
+
+
+def recorrer_paralelo(dir_path, exclude_patterns=None, workers=8, seguir_enlaces=False, cache=None,
+                      orden=None, todas=False):
+    """
+    Igual que recorrer, pero mantiene hasta `workers` listados de directorio en
+    vuelo en un pool de hilos. Pensado para sistemas de archivos de red, donde
+    cada listado espera una ida y vuelta al servidor.
+
+    El recorrido programa los listados en el orden en que los va a necesitar (los
+    subdirectorios del directorio actual antes que los hermanos pendientes de sus
+    ancestros) y nunca tiene más de VENTANA_POR_WORKER * workers programados sin
+    consumir, así que la memoria no crece con el árbol. Los resultados se consumen
+    en preorden, así que la salida es idéntica a la serie.
+    """
+    if workers <= 1:
+        yield from recorrer(dir_path, exclude_patterns, seguir_enlaces, cache, orden=orden, todas=todas)
+        return
+
+    ventana = VENTANA_POR_WORKER * workers
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='escaner')
+    en_vuelo = 0
+
+    def listar(entrada, cadena, rel_dir, exclusiones):
+        """Listado de un subdirectorio: (entradas, exclusiones, cadena), o None si no se desciende"""
+        cadena_hijo = _cadena_hijo(entrada, cadena, seguir_enlaces)
+        if cadena_hijo is None:
+            return None
+        entradas, exclusiones_hijo = _listar(entrada.ruta, _ruta_relativa(rel_dir, entrada.nombre),
+                                             exclusiones, cache, orden, todas)
+        return entradas, exclusiones_hijo, cadena_hijo
+
+    def marco_nuevo(entradas, exclusiones, cadena, rel_dir):
+        # entradas, futuros por entrada, siguiente a producir, siguiente a programar, cadena, rel_dir, exclusiones
+        return [entradas, [None] * len(entradas), 0, 0, cadena, rel_dir, exclusiones]
+
+    def programar():
+        """Completa la ventana con los próximos listados que va a necesitar el recorrido"""
+        nonlocal en_vuelo
+        for marco in reversed(pila):
+            entradas, futuros = marco[0], marco[1]
+            while en_vuelo < ventana and marco[3] < len(entradas):
+                i = marco[3]
+                marco[3] = i + 1
+                entrada = entradas[i]
+                if entrada.es_directorio and (seguir_enlaces or not entrada.es_enlace):
+                    futuros[i] = pool.submit(listar, entrada, marco[4], marco[5], marco[6])
+                    en_vuelo += 1
+            if en_vuelo >= ventana:
+                return
+
+    pila = []
+    try:
+        entradas, exclusiones = _listar(dir_path, '', Exclusiones.desde(exclude_patterns), cache, orden, todas)
+        pila.append(marco_nuevo(entradas, exclusiones, _cadena_raiz(dir_path, seguir_enlaces), ''))
+        programar()
+        while pila:
+            marco = pila[-1]
+            entradas, futuros, indice = marco[0], marco[1], marco[2]
+            if indice >= len(entradas):
+                pila.pop()
+                continue
+            marco[2] = indice + 1
+            entrada = entradas[indice]
+            yield len(pila) - 1, entrada, indice == len(entradas) - 1
+            if not entrada.es_directorio:
+                continue
+            if futuros[indice] is not None:
+                resultado = futuros[indice].result()
+                futuros[indice] = None
+                en_vuelo -= 1
+            elif marco[3] > indice:
+                continue  # Se decidió no descender (enlace no seguido)
+            else:
+                # La ventana estaba llena de listados que se necesitan después: listar aquí
+                marco[3] = indice + 1
+                resultado = listar(entrada, marco[4], marco[5], marco[6])
+            if resultado is not None:
+                hijos, exclusiones_hijo, cadena_hijo = resultado
+                pila.append(marco_nuevo(hijos, exclusiones_hijo, cadena_hijo,
+                                        _ruta_relativa(marco[5], entrada.nombre)))
+            programar()
+    finally:
+        # Si el consumidor se detiene antes de tiempo, los listados que no empezaron no se ejecutan
+        for marco in pila:
+            for futuro in marco[1]:
+                if futuro is not None:
+                    futuro.cancel()
+        pool.shutdown(wait=True)
+
+
+def extension(nombre: str) -> str:
+    """Extensión de un nombre de archivo con la misma semántica que Path.suffix"""
+    ext = os.path.splitext(nombre)[1]
+    return '' if ext == '.' else ext
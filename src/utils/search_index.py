@@ -0,0 +1,157 @@
+"""
+Índice de búsqueda por nombre sobre un árbol cargado (Nodo)
+"""
+
+import re
+from array import array
+from fnmatch import translate
+
+_COMODINES = re.compile(r'[*?\[]')
+_CLASE = re.compile(r'\[!?\]?[^\]]*\]')  # [abc], [!abc] o []abc]: un carácter cualquiera a efectos de literales
+_SEPARADOR_GLOB = re.compile(r'[*?]')
+
+
+def _trigramas(texto: str):
+    """Trigramas distintos de un texto"""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceBusqueda:
+    """
+    Índice de los nombres de un árbol para búsquedas instantáneas.
+
+    Cada entrada se identifica por su posición en el preorden del árbol, que es
+    también su línea en el documento renderizado. Por entrada se guardan el nodo,
+    el padre y el nivel; los nombres (en minúsculas) se agrupan en nombres
+    distintos, y de cada nombre distinto se indexan sus trigramas. Una búsqueda
+    toma la lista de trigramas más corta de la consulta y solo compara esos
+    nombres, así que no recorre el árbol ni el texto del editor.
+
+    La consulta es una subcadena del nombre o, si tiene *, ? o [], un patrón glob
+    que debe cubrir el nombre completo. No distingue mayúsculas.
+    """
+
+    def __init__(self):
+        self.nodos = []
+        self.padres = array('i')
+        self.niveles = array('i')
+        self.nombres = []        # Nombres distintos en minúsculas
+        self._ids_nombre = []    # Por nombre distinto: id de la entrada o lista de ids
+        self._nombre_id = {}     # Nombre en minúsculas -> índice en self.nombres
+        self._trigramas = None   # Trigrama -> array de índices de nombres distintos
+        self._pila = [-1]        # _pila[n] es el id del padre de las entradas del nivel n
+
+    @classmethod
+    def desde_arbol(cls, raiz) -> 'IndiceBusqueda':
+        """Indexa un árbol ya construido"""
+        indice = cls()
+        for _ in indice.indexar(raiz.recorrer()):
+            pass
+        indice.finalizar()
+        return indice
+
+    def indexar(self, recorrido):
+        """Registra las entradas de un recorrido (nivel, nodo, es_ultimo) y las reemite"""
+        nodos, padres, niveles, pila = self.nodos, self.padres, self.niveles, self._pila
+        nombre_id, nombres, ids_nombre = self._nombre_id, self.nombres, self._ids_nombre
+        for item in recorrido:
+            nivel, nodo, _ = item
+            id_nodo = len(nodos)
+            nodos.append(nodo)
+            padres.append(pila[nivel])
+            niveles.append(nivel)
+
+            clave = nodo.nombre.lower()
+            n = nombre_id.get(clave)
+            if n is None:
+                nombre_id[clave] = len(nombres)
+                nombres.append(clave)
+                ids_nombre.append(id_nodo)
+            elif isinstance(ids_nombre[n], int):
+                ids_nombre[n] = [ids_nombre[n], id_nodo]
+            else:
+                ids_nombre[n].append(id_nodo)
+
+            if nodo.es_directorio:
+                del pila[nivel + 1:]
+                pila.append(id_nodo)
+            yield item
+
+    def finalizar(self):
+        """
+        Arma el índice de trigramas de los nombres distintos al terminar de indexar.
+        Puede hacerse en otro hilo: el índice solo se publica (listo) al final.
+        """
+        trigramas = {}
+        for n, nombre in enumerate(self.nombres):
+            for trigrama in _trigramas(nombre):
+                lista = trigramas.get(trigrama)
+                if lista is None:
+                    trigramas[trigrama] = lista = array('i')
+                lista.append(n)
+        del self._pila[1:]
+        self._trigramas = trigramas
+
+    @property
+    def listo(self) -> bool:
+        """El índice de trigramas está armado y se puede buscar"""
+        return self._trigramas is not None
+
+    def __len__(self):
+        return len(self.nodos)
+
+    def _candidatos(self, literales):
+        """Nombres distintos que pueden coincidir: la lista de trigramas más corta, o todos"""
+        trigramas = set()
+        for literal in literales:
+            trigramas |= _trigramas(literal)
+        if not trigramas:
+            return range(len(self.nombres))
+        listas = [self._trigramas.get(trigrama, ()) for trigrama in trigramas]
+        return min(listas, key=len)
+
+    def coincidencias(self, consulta: str) -> list:
+        """Ids de las entradas cuyo nombre coincide con la consulta, en orden de documento"""
+        if self._trigramas is None:
+            self.finalizar()
+        consulta = consulta.strip().lower()
+        if not consulta:
+            return []
+
+        nombres = self.nombres
+        if _COMODINES.search(consulta):
+            patron = re.compile(translate(consulta))
+            literales = _SEPARADOR_GLOB.split(_CLASE.sub('*', consulta))
+            encontrados = [n for n in self._candidatos(literales)
+                           if patron.match(nombres[n])]
+        else:
+            encontrados = [n for n in self._candidatos((consulta,)) if consulta in nombres[n]]
+
+        ids = []
+        for n in encontrados:
+            ids_n = self._ids_nombre[n]
+            if isinstance(ids_n, int):
+                ids.append(ids_n)
+            else:
+                ids.extend(ids_n)
+        ids.sort()
+        return ids
+
+    def filtrar(self, ids):
+        """
+        Recorrido (nivel, nodo, es_ultimo) de las entradas indicadas y sus ancestros,
+        en preorden; es_ultimo se calcula dentro del resultado filtrado
+        """
+        padres = self.padres
+        incluidos = set()
+        for id_nodo in ids:
+            while id_nodo >= 0 and id_nodo not in incluidos:
+                incluidos.add(id_nodo)
+                id_nodo = padres[id_nodo]
+        orden = sorted(incluidos)
+
+        ultimo_hijo = {}
+        for id_nodo in orden:
+            ultimo_hijo[padres[id_nodo]] = id_nodo
+        for id_nodo in orden:
+            yield self.niveles[id_nodo], self.nodos[id_nodo], ultimo_hijo[padres[id_nodo]] == id_nodo
@@ -0,0 +1,351 @@
+"""
+Instantáneas binarias de un árbol escaneado: se guardan una vez y se vuelven a
+abrir sin analizar texto, con tamaños y fechas de modificación.
+
+Formato (versión 2, little-endian):
+
+    cabecera     64 bytes (CABECERA)
+    registros    un registro de 36 bytes (REGISTRO) por entrada, en preorden
+    offsets      n_nombres + 1 enteros de 4 bytes: inicio de cada nombre en el bloque
+    nombres      nombres distintos en UTF-8, uno detrás de otro
+    enlaces      (opcional, alineado a 4 bytes) un par (índice, id del destino) por
+                 enlace simbólico con destino conocido, por índice creciente
+
+Cada registro guarda el id de su nombre, su padre, el índice siguiente a su último
+descendiente (el subárbol de i son los registros i+1 .. fin-1), el nivel, los flags
+y, si se pudieron leer, tamaño y mtime en nanosegundos. Con eso cualquier subárbol
+se recorre directamente sobre el archivo mapeado con mmap. La versión 1 guardaba el
+nivel en 16 bits (registros de 32 bytes); se sigue pudiendo leer. La tabla de enlaces
+ocupa lo que antes era relleno de la cabecera (0 = sin tabla), así que los archivos
+anteriores se leen sin destinos.
+"""
+
+import logging
+import mmap
+from bisect import bisect_left
+import os
+import struct
+import sys
+import time
+from array import array
+
+logger = logging.getLogger('ConvertidorDirectorios')
+
+EXTENSION = '.cdsnap'
+MAGIA = b'CDSNAP\r\n'  # El \r\n delata archivos dañados por conversiones de fin de línea
+VERSION = 2
+
+# magia, versión, tamaño de registro, registros, nombres, id de la raíz, id del origen,
+# offset de los registros, de los offsets de nombres y del bloque de nombres, fecha, enlaces
+CABECERA = struct.Struct('<8sHHIIIIQQQdI')
+# id del nombre, padre, fin del subárbol, nivel, flags, tamaño, mtime_ns
+REGISTRO = struct.Struct('<IIIIB3xQq')
+REGISTROS = {1: struct.Struct('<IIIHBxQq'), 2: REGISTRO}  # Formato de registro de cada versión
+_CAMPO_FIN = struct.Struct('<I')
+_OFFSET_FIN = 8  # Posición del campo fin dentro del registro
+SIN_PADRE = 0xFFFFFFFF
+
+DIRECTORIO = 1
+ENLACE = 2
+ULTIMO = 4
+CON_METADATOS = 8
+
+LOTE_REGISTROS = 65536  # Registros que se decodifican de una vez al recorrer
+
+
+def es_instantanea(ruta: str) -> bool:
+    """Indica si el archivo empieza con la firma de una instantánea"""
+    try:
+        with open(ruta, 'rb') as f:
+            return f.read(len(MAGIA)) == MAGIA
+    except OSError:
+        return False
+
+
+def _metadatos(entrada, ruta_relativa: str, dir_raiz):
+    """(tamaño, mtime_ns) de una entrada: los que ya trae (p. ej. de otra instantánea) o los del disco; None si no hay"""
+    if getattr(entrada, 'mtime_ns', None) is not None:
+        return entrada.tamano or 0, entrada.mtime_ns
+    ruta = getattr(entrada, 'ruta', None)
+    if ruta is None:
+        if dir_raiz is None:
+            return None
+        ruta = os.path.join(dir_raiz, ruta_relativa)
+    try:
+        info = os.stat(ruta, follow_symlinks=not getattr(entrada, 'es_enlace', False))
+    except OSError:
+        return None
+    return info.st_size, info.st_mtime_ns
+
+
+def _destino(entrada, ruta_relativa, dir_raiz):
+    """Destino de un enlace simbólico (el que ya trae o el del disco), o None"""
+    destino = getattr(entrada, 'destino', None)
+    if destino is not None or not getattr(entrada, 'es_enlace', False):
+        return destino
+    ruta = getattr(entrada, 'ruta', None)
+    if ruta is None:
+        if ruta_relativa is None:
+            return None
+        ruta = os.path.join(dir_raiz, ruta_relativa)
+    try:
+        return os.readlink(ruta)
+    except OSError:
+        return None
+
+
+def guardar_instantanea(filename: str, recorrido, raiz: str, dir_raiz: str = None,
+                        metadatos: bool = True, origen: str = None) -> int:
+    """
+    Escribe una instantánea de un recorrido (nivel, entrada, es_ultimo) en preorden,
+    el del escáner, el de Nodo.recorrer o el de otra instantánea. `raiz` es el nombre
+    (o la ruta) de la raíz; los tamaños y fechas son los que traen las entradas de
+    una instantánea o se leen de la ruta de cada entrada del escáner o, para un árbol
+    en memoria, debajo de dir_raiz. Se registra como directorio de origen `origen`
+    o, si no se indica, dir_raiz. Devuelve la cantidad de entradas.
+    """
+    try:
+        nombres = {}
+        registros = bytearray()
+        pila = []    # Índices de los directorios abiertos; el del nivel n en la posición n
+        rutas = ['']
+        total = 0
+
+        def id_nombre(nombre):
+            id_n = nombres.get(nombre)
+            if id_n is None:
+                id_n = nombres[nombre] = len(nombres)
+            return id_n
+
+        id_raiz = id_nombre(os.path.basename(os.path.normpath(raiz)) or raiz)
+        origen = origen or dir_raiz
+        id_origen = id_nombre(os.path.abspath(origen) if origen else '')
+        # Las rutas relativas solo hacen falta para leer del disco debajo de dir_raiz
+        con_rutas = dir_raiz is not None
+        enlaces = array('I')  # Pares (índice, id del destino)
+
+        for nivel, entrada, es_ultimo in recorrido:
+            # Los directorios que se cierran terminan justo antes de esta entrada
+            while len(pila) > nivel:
+                _CAMPO_FIN.pack_into(registros, pila.pop() * REGISTRO.size + _OFFSET_FIN, total)
+
+            flags = (DIRECTORIO if entrada.es_directorio else 0) | (ULTIMO if es_ultimo else 0)
+            ruta = rutas[nivel] + entrada.nombre if con_rutas else None
+            if getattr(entrada, 'es_enlace', False):
+                flags |= ENLACE
+                destino = _destino(entrada, ruta, dir_raiz)
+                if destino is not None:
+                    enlaces.extend((total, id_nombre(destino)))
+            tamano = mtime_ns = 0
+            if metadatos:
+                datos = _metadatos(entrada, ruta, dir_raiz)
+                if datos is not None:
+                    tamano, mtime_ns = datos
+                    flags |= CON_METADATOS
+
+            padre = pila[nivel - 1] if nivel else SIN_PADRE
+            registros += REGISTRO.pack(id_nombre(entrada.nombre), padre, total + 1, nivel,
+                                       flags, tamano, mtime_ns)
+            if entrada.es_directorio:
+                pila.append(total)
+                if con_rutas:
+                    del rutas[nivel + 1:]
+                    rutas.append(ruta + '/')
+            total += 1
+
+        for abierto in pila:
+            _CAMPO_FIN.pack_into(registros, abierto * REGISTRO.size + _OFFSET_FIN, total)
+
+        bloque = bytearray()
+        offsets = array('I', [0])
+        for nombre in nombres:  # Los dict conservan el orden: la posición es el id
+            bloque += nombre.encode('utf-8', 'surrogateescape')
+            offsets.append(len(bloque))
+        if len(bloque) % 4:
+            bloque += bytes(4 - len(bloque) % 4)  # La tabla de enlaces empieza alineada
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+            enlaces.byteswap()
+
+        inicio_registros = CABECERA.size
+        inicio_offsets = inicio_registros + len(registros)
+        inicio_nombres = inicio_offsets + len(offsets) * offsets.itemsize
+        cabecera = CABECERA.pack(MAGIA, VERSION, REGISTRO.size, total, len(nombres), id_raiz, id_origen,
+                                 inicio_registros, inicio_offsets, inicio_nombres, time.time(),
+                                 len(enlaces) // 2)
+
+        with open(filename, 'wb') as f:
+            f.write(cabecera)
+            f.write(registros)
+            f.write(offsets.tobytes())
+            f.write(bloque)
+            f.write(enlaces.tobytes())
+        return total
+
+    except Exception as e:
+        logger.error("Error al guardar la instantánea: %s", e)
+        raise
+
+
+class EntradaInstantanea:
+    """Entrada leída de una instantánea; tamano, mtime_ns y destino son None si no se guardaron"""
+    __slots__ = ('indice', 'nombre', 'es_directorio', 'es_enlace', 'tamano', 'mtime_ns', 'destino')
+
+    def __init__(self, indice, nombre, flags, tamano, mtime_ns, destino=None):
+        self.indice = indice
+        self.destino = destino  # Destino de un enlace simbólico
+        self.nombre = nombre
+        self.es_directorio = bool(flags & DIRECTORIO)
+        self.es_enlace = bool(flags & ENLACE)
+        con_metadatos = flags & CON_METADATOS
+        self.tamano = tamano if con_metadatos and not self.es_directorio else None
+        self.mtime_ns = mtime_ns if con_metadatos else None
+
+
+class Instantanea:
+    """
+    Instantánea abierta con mmap. Solo se leen del disco las páginas que se usan:
+    abrirla cuesta lo mismo para cualquier tamaño y un subárbol se recorre sin
+    pasar por el resto. Se usa como context manager o se cierra con cerrar().
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._nombres = {}  # Caché de los nombres ya decodificados
+        self._mapa = None
+        self._archivo = open(filename, 'rb')
+        try:
+            if os.fstat(self._archivo.fileno()).st_size < CABECERA.size:
+                raise ValueError(f"{filename}: no es una instantánea de estructura")
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            self._leer_cabecera()
+        except Exception:
+            self.cerrar()
+            raise
+
+    def _leer_cabecera(self):
+        """Valida la cabecera y carga la tabla de offsets de los nombres"""
+        (magia, version, tamano_registro, self.total, n_nombres, id_raiz, id_origen,
+         self._inicio_registros, inicio_offsets, self._inicio_nombres, self.creado, n_enlaces) = \
+            CABECERA.unpack_from(self._mapa, 0)
+        if magia != MAGIA:
+            raise ValueError(f"{self.filename}: no es una instantánea de estructura")
+        if version not in REGISTROS:
+            raise ValueError(f"{self.filename}: instantánea versión {version}, "
+                             f"esta aplicación lee hasta la {VERSION}")
+        self._registro = REGISTROS[version]
+        if tamano_registro != self._registro.size:
+            raise ValueError(f"{self.filename}: registros de {tamano_registro} bytes, "
+                             f"se esperaban {self._registro.size}")
+
+        fin_offsets = inicio_offsets + (n_nombres + 1) * 4
+        if (self._inicio_registros + self.total * self._registro.size > inicio_offsets
+                or fin_offsets > self._inicio_nombres or self._inicio_nombres > len(self._mapa)):
+            raise ValueError(f"{self.filename}: la instantánea está incompleta o dañada")
+        self._offsets = array('I')
+        self._offsets.frombytes(self._mapa[inicio_offsets:fin_offsets])
+        if sys.byteorder == 'big':
+            self._offsets.byteswap()
+        if self._inicio_nombres + self._offsets[-1] > len(self._mapa):
+            raise ValueError(f"{self.filename}: la instantánea está incompleta o dañada")
+        inicio_enlaces = self._inicio_nombres + (self._offsets[-1] + 3) // 4 * 4
+        if n_enlaces and inicio_enlaces + n_enlaces * 8 > len(self._mapa):
+            raise ValueError(f"{self.filename}: la instantánea está incompleta o dañada")
+        pares = array('I')
+        pares.frombytes(self._mapa[inicio_enlaces:inicio_enlaces + n_enlaces * 8])
+        if sys.byteorder == 'big':
+            pares.byteswap()
+        self._enlaces, self._destinos = pares[0::2], pares[1::2]  # Índices crecientes y sus destinos
+        self.raiz = self._nombre(id_raiz)
+        self.origen = self._nombre(id_origen) or None  # Directorio escaneado, si se conoce
+
+    def cerrar(self):
+        """Libera el mapeo y el archivo"""
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def __len__(self):
+        return self.total
+
+    def _nombre(self, id_nombre: int) -> str:
+        nombre = self._nombres.get(id_nombre)
+        if nombre is None:
+            inicio = self._inicio_nombres + self._offsets[id_nombre]
+            fin = self._inicio_nombres + self._offsets[id_nombre + 1]
+            nombre = self._mapa[inicio:fin].decode('utf-8', 'surrogateescape')
+            self._nombres[id_nombre] = nombre
+        return nombre
+
+    def _destino(self, indice: int):
+        """Destino guardado del enlace de la posición indicada, o None"""
+        posicion = bisect_left(self._enlaces, indice)
+        if posicion < len(self._enlaces) and self._enlaces[posicion] == indice:
+            return self._nombre(self._destinos[posicion])
+        return None
+
+    def registro(self, indice: int):
+        """(id_nombre, padre, fin, nivel, flags, tamaño, mtime_ns) de una entrada"""
+        if not 0 <= indice < self.total:
+            raise IndexError(indice)
+        return self._registro.unpack_from(self._mapa, self._inicio_registros + indice * self._registro.size)
+
+    def entrada(self, indice: int) -> EntradaInstantanea:
+        """Entrada de la posición indicada del preorden"""
+        id_nombre, _, _, _, flags, tamano, mtime_ns = self.registro(indice)
+        destino = self._destino(indice) if flags & ENLACE else None
+        return EntradaInstantanea(indice, self._nombre(id_nombre), flags, tamano, mtime_ns, destino)
+
+    def hijos(self, indice: int = None):
+        """Índices de los hijos directos de una entrada (de la raíz con None)"""
+        if indice is None:
+            actual, fin = 0, self.total
+        else:
+            actual, fin = indice + 1, self.registro(indice)[2]
+        while actual < fin:
+            yield actual
+            actual = self.registro(actual)[2]
+
+    def buscar(self, ruta_relativa: str):
+        """Índice de la entrada en ruta_relativa ('src/utils'), None para la raíz; KeyError si no existe"""
+        indice = None
+        for parte in ruta_relativa.replace('\\', '/').strip('/').split('/'):
+            if not parte or parte == '.':
+                continue
+            for hijo in self.hijos(indice):
+                if self._nombre(self.registro(hijo)[0]) == parte:
+                    indice = hijo
+                    break
+            else:
+                raise KeyError(ruta_relativa)
+        return indice
+
+    def recorrer(self, indice: int = None):
+        """
+        Recorrido (nivel, entrada, es_ultimo) en preorden, el formato del escáner, de
+        todo el árbol o de los descendientes de `indice`, con niveles relativos a él
+        """
+        if indice is None:
+            inicio, fin, base = 0, self.total, 0
+        else:
+            _, _, fin, nivel, _, _, _ = self.registro(indice)
+            inicio, base = indice + 1, nivel + 1
+
+        cache, nombre, registro = self._nombres, self._nombre, self._registro
+        posicion = inicio
+        while posicion < fin:
+            cantidad = min(LOTE_REGISTROS, fin - posicion)
+            desde = self._inicio_registros + posicion * registro.size
+            lote = self._mapa[desde:desde + cantidad * registro.size]
+            for i, (id_nombre, _, _, nivel, flags, tamano, mtime_ns) in enumerate(registro.iter_unpack(lote), posicion):
+                texto = cache.get(id_nombre) or nombre(id_nombre)
+                destino = self._destino(i) if flags & ENLACE else None
+                yield nivel - base, EntradaInstantanea(i, texto, flags, tamano, mtime_ns, destino), flags & ULTIMO != 0
+            posicion += cantidad
@@ -0,0 +1,229 @@
+"""
+Análisis único de estructuras escritas como texto (árbol con conectores, iconos o indentación)
+"""
+
+import ntpath
+import os
+import re
+
+# Una línea se divide en: prefijo de indentación (espacios, tabs, espacios de no separación
+# como los de tree, │ o |), conector opcional y resto
+_LINEA = re.compile(r'(?P<prefijo>[ \t\u00a0│|]*)(?P<conector>[├└][─-]+[ \t]*)?(?P<resto>.*)')
+# Icono (emoji) o viñeta markdown delante del nombre: "📁 src/", "🐍 main.py", "- README.md"
+_ICONO = re.compile(r'(?:[^\w\s.\-/\\]+|[-*+])\s+')
+_SEPARADOR_RUTA = re.compile(r'[\\/]')
+_UNIDAD = re.compile(r'[A-Za-z]:')
+
+
+def _error_nombre(nombre: str):
+    """Mensaje de error si el nombre no puede crearse dentro del destino, o None"""
+    if not nombre:
+        return "Falta el nombre de la entrada"
+    # Una ruta absoluta o con unidad ('C:/x', 'C:x') haría que os.path.join descarte el destino
+    if (nombre.startswith(('/', '\\')) or os.path.isabs(nombre)
+            or _UNIDAD.match(nombre) or ntpath.splitdrive(nombre)[0]):
+        return f"Nombre no válido: {nombre}"
+    if any(parte in ('.', '..') for parte in _SEPARADOR_RUTA.split(nombre)):
+        return f"Nombre no válido: {nombre}"
+    if '\0' in nombre:
+        return "El nombre contiene caracteres no válidos"
+    return None
+
+
+def tokenizar_linea(linea: str):
+    """
+    Token de una línea: (ancho_prefijo, tiene_conector, nombre, es_directorio, error_nombre),
+    o None si está vacía. Solo depende de la línea, así que puede guardarse entre análisis.
+    """
+    if not linea.strip():
+        return None
+    m = _LINEA.match(linea)
+    resto = m.group('resto')
+    icono = _ICONO.match(resto)
+    if icono:
+        resto = resto[icono.end():]
+    nombre = resto.strip()
+    es_directorio = nombre.endswith('/')
+    nombre = nombre.rstrip('/')
+    return len(m.group('prefijo')), m.group('conector') is not None, nombre, es_directorio, _error_nombre(nombre)
+
+
+def segmentar_linea(linea: str):
+    """
+    Partes de una línea para resaltarla: (indentacion_y_conector, icono, nombre), con el
+    icono incluyendo el espacio que lo sigue y el nombre sin espacios alrededor; None si
+    la línea está vacía
+    """
+    if not linea.strip():
+        return None
+    m = _LINEA.match(linea)
+    resto = m.group('resto')
+    icono = _ICONO.match(resto)
+    icono = icono.group() if icono else ''
+    return m.group('prefijo') + (m.group('conector') or ''), icono, resto[len(icono):].strip()
+
+
+class LineaEstructura:
+    """Entrada de la estructura analizada, con el número de línea del texto original"""
+    __slots__ = ('numero', 'nombre', 'es_directorio', 'padre', 'profundidad', 'es_ultimo')
+
+    def __init__(self, numero, nombre, es_directorio, padre, profundidad):
+        self.numero = numero
+        self.nombre = nombre
+        self.es_directorio = es_directorio
+        self.padre = padre  # Índice de la entrada padre o -1 si está en la raíz
+        self.profundidad = profundidad
+        self.es_ultimo = True
+
+
+class EstructuraAnalizada:
+    """
+    Resultado de analizar una estructura: las entradas en orden de documento (que
+    ya es un preorden) y los errores encontrados como (numero_de_linea, mensaje).
+
+    Si el texto tiene un bloque ``` (como los archivos de guardar_estructura), solo
+    se analiza su contenido. Se reconocen tres formatos. Si alguna línea tiene
+    conectores (├── / └──), solo esas líneas son entradas: lo que está antes de la
+    primera y después de la última (título, raíz, resumen de tree) se ignora y una
+    línea sin conector entre ellas es un error. Si no, cada línea es una entrada y su
+    nivel sale de la indentación. Los niveles se miden desde el prefijo más corto y
+    el ancho de un nivel es el del menor prefijo restante; un prefijo que no es
+    múltiplo de ese ancho es un error. Una entrada con hijos es siempre un directorio.
+    """
+
+    def __init__(self, texto: str):
+        self.entradas = []
+        self.errores = []
+        self._analizar(texto)
+
+    @property
+    def es_valida(self) -> bool:
+        """Hay al menos una entrada y ningún error"""
+        return bool(self.entradas) and not self.errores
+
+    def recorrer(self):
+        """Produce (profundidad, entrada, es_ultimo), el mismo formato que el escáner"""
+        for entrada in self.entradas:
+            yield entrada.profundidad, entrada, entrada.es_ultimo
+
+    @classmethod
+    def desde_tokens(cls, tokens) -> 'EstructuraAnalizada':
+        """Arma el análisis a partir de los tokens por línea de tokenizar_linea (None = línea vacía)"""
+        analisis = cls('')
+        analisis._construir([(numero,) + token for numero, token in enumerate(tokens, 1) if token])
+        return analisis
+
+    def _analizar(self, texto: str):
+        """Tokeniza el texto una vez y arma el árbol"""
+        if texto:
+            self._construir([(numero,) + token for numero, token in
+                             enumerate(map(tokenizar_linea, texto.split('\n')), 1) if token])
+
+    def _construir(self, tokens):
+        """Arma el árbol con una pila de niveles abiertos; tokens: (numero,) + token de tokenizar_linea"""
+        entradas = self.entradas
+        errores = self.errores
+        tokens = _contenido_bloque(tokens)
+
+        con_conectores = any(token[2] for token in tokens)
+        if con_conectores:
+            posiciones = [i for i, token in enumerate(tokens) if token[2]]
+            for numero, _, conector, nombre, _, _ in tokens[posiciones[0]:posiciones[-1] + 1]:
+                # Las líneas que solo tienen │ separan ramas; cualquier otra cosa sin conector se perdería
+                if not conector and nombre:
+                    errores.append((numero, f"Línea sin conector dentro del árbol: {nombre}"))
+            tokens = [tokens[i] for i in posiciones]
+
+        base = min((token[1] for token in tokens), default=0)
+        unidad = min((token[1] - base for token in tokens if token[1] > base),
+                     default=4 if con_conectores else 2)
+
+        pila = []  # (nivel, indice) de las entradas que pueden recibir hijos
+        ultimo_hijo = {}  # indice del padre -> indice de su último hijo
+        for numero, ancho, _, nombre, es_directorio, error in tokens:
+            nivel, resto = divmod(ancho - base, unidad)
+            if resto:
+                errores.append(
+                    (numero, f"Indentación inválida: {ancho - base} no es múltiplo de {unidad}")
+                )
+            if error:
+                errores.append((numero, error))
+
+            while pila and pila[-1][0] >= nivel:
+                pila.pop()
+            if pila and nivel > pila[-1][0] + 1:
+                errores.append(
+                    (numero, f"Indentación inválida: salta del nivel {pila[-1][0]} al {nivel}")
+                )
+
+            padre = pila[-1][1] if pila else -1
+            profundidad = 0
+            if padre >= 0:
+                entradas[padre].es_directorio = True
+                profundidad = entradas[padre].profundidad + 1
+            indice = len(entradas)
+            entradas.append(LineaEstructura(numero, nombre, es_directorio, padre, profundidad))
+            ultimo_hijo[padre] = indice
+            pila.append((nivel, indice))
+
+        for indice, entrada in enumerate(entradas):
+            entrada.es_ultimo = ultimo_hijo[entrada.padre] == indice
+        errores.sort(key=lambda error: error[0])
+
+
+def _contenido_bloque(tokens):
+    """
+    Tokens dentro del primer bloque ``` del texto, o todos si no hay. guardar_estructura
+    deja la primera línea de la estructura detrás de la indentación de la valla de
+    apertura, así que a esa línea se le descuenta.
+    """
+    vallas = [i for i, token in enumerate(tokens) if not token[2] and token[3].startswith('```')]
+    if not vallas:
+        return tokens
+    apertura = tokens[vallas[0]]
+    fin = vallas[1] if len(vallas) > 1 else len(tokens)
+    contenido = tokens[vallas[0] + 1:fin]
+    if contenido and contenido[0][0] == apertura[0] + 1 and contenido[0][1] >= apertura[1]:
+        contenido[0] = (contenido[0][0], contenido[0][1] - apertura[1]) + contenido[0][2:]
+    return contenido
+
+
+class AnalisisIncremental:
+    """
+    Análisis de un texto que se edita: guarda las líneas y sus tokens, y en cada
+    actualización vuelve a tokenizar solo el rango de líneas que cambió (lo que
+    queda entre el prefijo y el sufijo comunes con la versión anterior). El árbol
+    se arma de nuevo con los tokens guardados, porque el formato, el ancho de nivel
+    y los errores de indentación dependen del documento completo.
+    """
+
+    def __init__(self):
+        self.lineas = []
+        self.tokens = []
+        self.analisis = None
+
+    def actualizar(self, lineas) -> EstructuraAnalizada:
+        """Analiza la nueva versión del texto (lista de líneas) reutilizando lo que no cambió"""
+        viejas = self.lineas
+        n_viejas, n_nuevas = len(viejas), len(lineas)
+        limite = min(n_viejas, n_nuevas)
+
+        inicio = 0
+        while inicio < limite and viejas[inicio] == lineas[inicio]:
+            inicio += 1
+        if inicio == n_viejas == n_nuevas and self.analisis is not None:
+            return self.analisis
+
+        fin = 0
+        while fin < limite - inicio and viejas[n_viejas - 1 - fin] == lineas[n_nuevas - 1 - fin]:
+            fin += 1
+
+        self.tokens[inicio:n_viejas - fin] = map(tokenizar_linea, lineas[inicio:n_nuevas - fin])
+        self.lineas = lineas
+        self.analisis = EstructuraAnalizada.desde_tokens(self.tokens)
+        return self.analisis
+
+
+def analizar_estructura(texto: str) -> EstructuraAnalizada:
+    """Analiza una estructura pegada; validación, normalización y creación usan el resultado"""
+    return EstructuraAnalizada(texto)
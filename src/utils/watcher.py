@@ -0,0 +1,242 @@
+"""
+Vigilancia de cambios en un directorio cargado (inotify en Linux, sondeo en el resto)
+"""
+
+import abc
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+import logging
+
+logger = logging.getLogger('ConvertidorDirectorios')
+
+
+class DirectoryWatcher(abc.ABC):
+    """
+    Base de los vigilantes. Acumula las rutas relativas de los directorios cuyo
+    listado cambió (None si hay que reescanear todo) y las entrega agrupadas como
+    un set por `cola`: un lote se emite cuando pasan
+    ESPERA segundos sin eventos nuevos (o ESPERA_MAXIMA desde el primero), así que un
+    `git checkout` que toca miles de archivos produce una sola actualización.
+    """
+
+    ESPERA = 0.3
+    ESPERA_MAXIMA = 2.0
+    INTERVALO = 0.1  # Espera máxima de cada iteración del hilo
+
+    def __init__(self, dir_raiz: str, rel_dirs):
+        self.dir_raiz = dir_raiz
+        self.cola = queue.Queue()
+        self._pendientes = set()
+        self._perdidos = set()  # Directorios que dejaron de vigilarse porque desaparecieron
+        self._primer_evento = None
+        self._ultimo_evento = None
+        self._lock = threading.Lock()
+        self._detenido = threading.Event()
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self.vigilar(rel_dirs)
+
+    @staticmethod
+    def crear(dir_raiz: str, rel_dirs) -> 'DirectoryWatcher':
+        """Usa inotify cuando está disponible y el sondeo de mtimes si no"""
+        rel_dirs = list(rel_dirs)
+        if sys.platform.startswith('linux'):
+            try:
+                return InotifyWatcher(dir_raiz, rel_dirs)
+            except OSError as e:
+                logger.warning("inotify no disponible (%s), se usará sondeo", e)
+        return PollingWatcher(dir_raiz, rel_dirs)
+
+    def iniciar(self):
+        """Empieza a vigilar en segundo plano"""
+        self._hilo.start()
+
+    def detener(self):
+        """Deja de vigilar y libera los recursos"""
+        self._detenido.set()
+        if self._hilo.is_alive():
+            self._hilo.join()
+        self._cerrar()
+
+    @abc.abstractmethod
+    def vigilar(self, rel_dirs):
+        """
+        Agrega directorios (rutas relativas a la raíz) a la vigilancia; los que ya
+        se vigilan no cambian, así que puede llamarse con los hijos de cada
+        directorio que se vuelve a listar
+        """
+
+    def _ruta(self, rel_dir: str) -> str:
+        """Ruta real de un directorio vigilado"""
+        return os.path.join(self.dir_raiz, *rel_dir.split('/')) if rel_dir else self.dir_raiz
+
+    def _perdido(self, rel_dir):
+        """Anota un directorio que dejó de vigilarse (se borró o se movió)"""
+        with self._lock:
+            self._perdidos.add(rel_dir)
+
+    def _recuperado(self, rel_dir):
+        """
+        Un directorio vuelve a vigilarse: si se había perdido (borrado y creado de
+        nuevo) su contenido pudo cambiar sin eventos, así que se registra como cambiado
+        """
+        with self._lock:
+            if rel_dir not in self._perdidos:
+                return
+            self._perdidos.discard(rel_dir)
+        self._registrar(rel_dir)
+
+    def _registrar(self, rel_dir):
+        """Anota un directorio cuyo listado cambió"""
+        ahora = time.monotonic()
+        with self._lock:
+            if not self._pendientes:
+                self._primer_evento = ahora
+            self._pendientes.add(rel_dir)
+            self._ultimo_evento = ahora
+
+    def _emitir_si_corresponde(self):
+        """Entrega el lote pendiente si los eventos se calmaron o se esperó demasiado"""
+        ahora = time.monotonic()
+        with self._lock:
+            if not self._pendientes:
+                return
+            if (ahora - self._ultimo_evento < self.ESPERA
+                    and ahora - self._primer_evento < self.ESPERA_MAXIMA):
+                return
+            lote, self._pendientes = self._pendientes, set()
+        self.cola.put(lote)
+
+    def _ejecutar(self):
+        """Cuerpo del hilo de vigilancia"""
+        while not self._detenido.is_set():
+            try:
+                self._esperar_eventos(self.INTERVALO)
+            except Exception as e:
+                logger.error("Error vigilando cambios: %s", e)
+                return
+            self._emitir_si_corresponde()
+
+    @abc.abstractmethod
+    def _esperar_eventos(self, timeout: float):
+        """Espera hasta `timeout` segundos y registra los cambios detectados"""
+
+    def _cerrar(self):
+        """Libera los recursos del sistema"""
+
+
+class PollingWatcher(DirectoryWatcher):
+    """Detecta cambios comparando periódicamente el mtime de cada directorio vigilado"""
+
+    INTERVALO_SONDEO = 1.0
+
+    def __init__(self, dir_raiz: str, rel_dirs):
+        self._mtimes = {}
+        self._proximo_sondeo = 0.0
+        super().__init__(dir_raiz, rel_dirs)
+
+    def vigilar(self, rel_dirs):
+        for rel_dir in rel_dirs:
+            if rel_dir in self._mtimes:
+                continue
+            try:
+                self._mtimes[rel_dir] = os.stat(self._ruta(rel_dir)).st_mtime_ns
+            except OSError:
+                continue
+            self._recuperado(rel_dir)
+
+    def sondear(self):
+        """Compara los mtimes actuales con los anteriores y registra los cambios"""
+        for rel_dir, mtime in list(self._mtimes.items()):
+            try:
+                actual = os.stat(self._ruta(rel_dir)).st_mtime_ns
+            except OSError:
+                # Un directorio borrado se refleja en el listado de su padre
+                del self._mtimes[rel_dir]
+                self._perdido(rel_dir)
+                continue
+            if actual != mtime:
+                self._mtimes[rel_dir] = actual
+                self._registrar(rel_dir)
+
+    def _esperar_eventos(self, timeout: float):
+        if time.monotonic() >= self._proximo_sondeo:
+            self.sondear()
+            self._proximo_sondeo = time.monotonic() + self.INTERVALO_SONDEO
+        self._detenido.wait(timeout)
+
+
+class InotifyWatcher(DirectoryWatcher):
+    """Recibe los cambios del kernel con inotify (un watch por directorio)"""
+
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_ONLYDIR = 0x01000000
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    MASCARA = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+    EVENTO = struct.Struct('iIII')  # wd, mask, cookie, len
+
+    def __init__(self, dir_raiz: str, rel_dirs):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self._rutas_wd = {}  # wd -> ruta relativa
+        try:
+            super().__init__(dir_raiz, rel_dirs)
+        except OSError:
+            os.close(self._fd)
+            raise
+
+    def vigilar(self, rel_dirs):
+        for rel_dir in rel_dirs:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(self._ruta(rel_dir)), self.MASCARA)
+            if wd < 0:
+                errno = ctypes.get_errno()
+                if errno == 28:  # ENOSPC: se alcanzó max_user_watches
+                    raise OSError(errno, "Límite de watches de inotify alcanzado")
+                continue  # El directorio desapareció entre el escaneo y la vigilancia
+            self._rutas_wd[wd] = rel_dir
+            self._recuperado(rel_dir)
+
+    def _esperar_eventos(self, timeout: float):
+        listos, _, _ = select.select([self._fd], [], [], timeout)
+        if not listos:
+            return
+        try:
+            datos = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+
+        desplazamiento = 0
+        while desplazamiento < len(datos):
+            wd, mascara, _, largo = self.EVENTO.unpack_from(datos, desplazamiento)
+            desplazamiento += self.EVENTO.size + largo
+
+            if mascara & self.IN_Q_OVERFLOW:
+                # Se perdieron eventos: None pide volver a escanear todo
+                self._registrar(None)
+                continue
+            rel_dir = self._rutas_wd.get(wd)
+            if rel_dir is None:
+                continue
+            if mascara & self.IN_IGNORED:
+                # El kernel retiró el watch (directorio borrado o movido)
+                del self._rutas_wd[wd]
+                self._perdido(rel_dir)
+                continue
+            self._registrar(rel_dir)
+
+    def _cerrar(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1